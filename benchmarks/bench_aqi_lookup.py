@@ -0,0 +1,124 @@
+"""
+Compare exact and lookup-table AQI sub-index evaluation.
+
+For every pollutant of the selected standard, draws synthetic hourly-like
+concentrations (including exact breakpoint values and missing readings),
+times ``evaluate_sub_index`` against ``evaluate_sub_index_lookup`` and
+reports the speedup together with the largest observed error and the
+table's documented bound::
+
+    python benchmarks/bench_aqi_lookup.py --rows 10000000
+    python benchmarks/bench_aqi_lookup.py --standard us_epa --resolution 1000
+    python benchmarks/bench_aqi_lookup.py --gap-mode truncate
+
+A sample is also checked against the scalar ``compute_sub_index``. Exits
+non-zero if any observed error exceeds the documented bound.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Optional
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+
+from aqi_engine import (  # noqa: E402
+    DEFAULT_GAP_MODE,
+    GAP_MODES,
+    build_lookup_table,
+    compile_lookup_tables,
+    compute_sub_index,
+    evaluate_sub_index,
+    evaluate_sub_index_lookup,
+)
+from aqi_standards import AQI_STANDARDS, get_standard, standard_tables  # noqa: E402
+
+SCALAR_SAMPLE = 20_000
+# tolerance for floating-point rounding on top of the documented bound
+ROUNDING_SLACK = 1e-9
+
+
+def best_of(repeats: int, func, *args) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def concentrations(rng: np.random.Generator, top: float, rows: int) -> np.ndarray:
+    """Skewed concentrations up to past the last breakpoint, with gaps."""
+    values = rng.gamma(2.0, top / 8.0, rows)
+    values = np.round(values, 1)
+    values[rng.random(rows) < 0.01] = np.nan
+    return values
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark lookup-table AQI evaluation")
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--standard", default="cpcb", choices=sorted(AQI_STANDARDS))
+    parser.add_argument(
+        "--resolution",
+        type=float,
+        default=None,
+        help="grid cells per concentration unit (default: aqi_engine.LOOKUP_RESOLUTION)",
+    )
+    parser.add_argument("--gap-mode", default=DEFAULT_GAP_MODE, choices=GAP_MODES)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    standard = get_standard(args.standard)
+    rng = np.random.default_rng(args.seed)
+    failed = False
+    header = f"{'pollutant':<10}{'cells':>10}{'exact s':>10}{'lookup s':>10}{'speedup':>9}"
+    header += f"{'max err':>11}{'bound':>11}"
+    print(header)
+    print("-" * len(header))
+    tables = standard_tables(standard, args.gap_mode)
+    lookups = compile_lookup_tables(tables)
+    for pollutant, table in tables.items():
+        lookup = (
+            build_lookup_table(table, args.resolution)
+            if args.resolution is not None
+            else lookups[pollutant]
+        )
+        top = table.conc_hi[-1] / table.scale
+        values = concentrations(rng, top, args.rows)
+        values[: len(table.conc_hi)] = table.conc_hi / table.scale
+        exact_s = best_of(args.repeats, evaluate_sub_index, values, table)
+        lookup_s = best_of(args.repeats, evaluate_sub_index_lookup, values, lookup)
+        exact = evaluate_sub_index(values, table)
+        approx = evaluate_sub_index_lookup(values, lookup)
+        error = float(np.nanmax(np.abs(exact - approx)))
+        sample = values[:SCALAR_SAMPLE]
+        scalar = np.array(
+            [
+                compute_sub_index(v * table.scale, standard.breakpoints[pollutant], args.gap_mode)
+                for v in sample
+            ]
+        )
+        scalar_error = float(np.nanmax(np.abs(scalar - approx[:SCALAR_SAMPLE])))
+        worst = max(error, scalar_error)
+        failed |= worst > lookup.max_error + ROUNDING_SLACK
+        print(
+            f"{pollutant:<10}{len(lookup.values):>10,}{exact_s:>10.3f}{lookup_s:>10.3f}"
+            f"{exact_s / lookup_s:>8.1f}x{worst:>11.5f}{lookup.max_error:>11.5f}"
+        )
+    if failed:
+        print("FAIL: observed error above the documented bound")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Import-time check for the core AQI module.
+
+Imports ``aqi_engine`` (and, for reference, ``air_quality_pipeline``) in
+fresh interpreters and reports the best wall time over ``--repeats`` runs,
+together with the heavy modules each import pulled in. Exits non-zero when
+``aqi_engine`` takes longer than ``--max-ms`` or loads pandas, matplotlib
+or requests, or when the pipeline module loads matplotlib or requests::
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --repeats 10 --max-ms 200
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / "src"
+
+HEAVY_MODULES = ("pandas", "pyarrow", "matplotlib", "requests")
+# modules each import must not load
+FORBIDDEN = {
+    "aqi_engine": ("pandas", "matplotlib", "requests"),
+    "air_quality_pipeline": ("matplotlib", "requests"),
+}
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps([elapsed, [m for m in {heavy!r} if m in sys.modules]]))
+"""
+
+
+def time_import(module: str) -> Tuple[float, List[str]]:
+    """Seconds to import ``module`` in a new interpreter, and heavy modules loaded."""
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    elapsed, loaded = json.loads(out.stdout.strip().splitlines()[-1])
+    return elapsed, loaded
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Guard import time of the AQI engine")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=250.0,
+        help="largest acceptable best-of import time of aqi_engine",
+    )
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module, forbidden in FORBIDDEN.items():
+        runs = [time_import(module) for _ in range(args.repeats)]
+        best = min(elapsed for elapsed, _ in runs)
+        loaded = runs[0][1]
+        print(f"{module:<22}{best * 1000:>8.0f} ms   loads: {', '.join(loaded) or '-'}")
+        unwanted = [name for name in loaded if name in forbidden]
+        if unwanted:
+            print(f"FAIL: importing {module} loads {', '.join(unwanted)}")
+            failed = True
+        if module == "aqi_engine" and best * 1000 > args.max_ms:
+            print(f"FAIL: aqi_engine import above {args.max_ms:.0f} ms")
+            failed = True
+    if failed:
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
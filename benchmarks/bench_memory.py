@@ -0,0 +1,151 @@
+"""
+Peak-memory check for the in-memory processing stages.
+
+Generates a large synthetic hourly frame, then runs ``preprocess``,
+``add_aqi_columns(copy=False)`` and ``summarize`` the way ``run_pipeline``
+does, tracking the tracemalloc peak on top of the raw frame. Exits non-zero
+when the total (raw + peak extra) exceeds ``--max-ratio`` × the raw size::
+
+    python benchmarks/bench_memory.py --stations 100 --years 2
+
+With ``--streaming`` the data is written to a scratch raw store and
+aggregated with ``preprocess_chunks``. The streaming peak is bounded by
+``--max-stream-ratio`` × the whole raw frame (the daily result grows with
+the dataset), plus ``--chunk-factor`` × the raw size of the largest chunk
+(``--chunk-months`` of one station, decoded and sorted in place), plus
+``STREAM_FIXED_MB`` of overhead that does not depend on scale. At small
+scales, where one chunk is a large share of the data, the bound therefore
+loosens instead of failing a correct implementation.
+The scratch store is also queried for a station it does not hold, which
+must return an empty frame with the same dtypes as a populated one.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Optional
+
+import argparse
+import sys
+import tempfile
+import tracemalloc
+
+import pandas as pd
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+
+import air_quality_pipeline as pipeline  # noqa: E402
+import raw_store  # noqa: E402
+from synthetic import generate_hourly  # noqa: E402
+
+# Arrow dataset metadata and per-run buffers, independent of the data size
+STREAM_FIXED_MB = 2.0
+
+
+def measure(n_stations: int, years: float, seed: int = 0) -> tuple:
+    raw = generate_hourly(n_stations=n_stations, years=years, seed=seed)
+    raw_bytes = int(raw.memory_usage(deep=True).sum())
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    clean = pipeline.preprocess(raw)
+    del raw
+    clean = pipeline.add_aqi_columns(clean, copy=False)
+    pipeline.summarize(clean)
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return raw_bytes, peak
+
+
+def _dtype_kind(dtype: object) -> str:
+    # an empty categorical has no categories, so only its kind is compared
+    return "category" if isinstance(dtype, pd.CategoricalDtype) else str(dtype)
+
+
+def empty_query_mismatches(root: Path) -> List[str]:
+    """Columns whose dtype differs between an empty and a populated query."""
+    columns = pipeline.RAW_COLUMNS
+    populated = raw_store.load_raw(root, columns=columns).head(0)
+    empty = raw_store.load_raw(root, ["<absent>"], "2000-01-01", "2000-01-31", columns=columns)
+    if not empty.empty or list(empty.columns) != list(populated.columns):
+        return ["<columns>"]
+    return [
+        col
+        for col in populated.columns
+        if _dtype_kind(empty[col].dtype) != _dtype_kind(populated[col].dtype)
+    ]
+
+
+def measure_streaming(
+    n_stations: int, years: float, seed: int = 0, chunk_months: int = 12
+) -> tuple:
+    raw = generate_hourly(n_stations=n_stations, years=years, seed=seed)
+    raw_bytes = int(raw.memory_usage(deep=True).sum())
+    # stations span the same months, so a chunk holds this share of the rows
+    months = raw["datetime"].dt.to_period("M").nunique()
+    chunk_bytes = raw_bytes * min(chunk_months, months) / (n_stations * months)
+    with tempfile.TemporaryDirectory() as workdir:
+        root = Path(workdir) / "hourly"
+        raw_store.update_raw(root, raw)
+        del raw
+        mismatched = empty_query_mismatches(root)
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        chunks = raw_store.iter_raw(
+            root, columns=pipeline.RAW_COLUMNS, chunk_months=chunk_months
+        )
+        pipeline.preprocess_chunks(chunks)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+    return raw_bytes, chunk_bytes, peak, mismatched
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check peak memory of the processing stages")
+    parser.add_argument("--stations", type=int, default=100)
+    parser.add_argument("--years", type=float, default=2.0)
+    parser.add_argument("--max-ratio", type=float, default=1.5)
+    parser.add_argument("--streaming", action="store_true")
+    parser.add_argument("--chunk-months", type=int, default=12)
+    parser.add_argument("--max-stream-ratio", type=float, default=0.4)
+    parser.add_argument("--chunk-factor", type=float, default=8.0)
+    args = parser.parse_args(argv)
+
+    if args.streaming:
+        raw_bytes, chunk_bytes, peak, mismatched = measure_streaming(
+            args.stations, args.years, chunk_months=args.chunk_months
+        )
+        if mismatched:
+            print(f"FAIL: empty raw-store query mistyped ({', '.join(mismatched)})")
+            return 1
+        limit = (
+            args.max_stream_ratio * raw_bytes
+            + args.chunk_factor * chunk_bytes
+            + STREAM_FIXED_MB * 2**20
+        )
+        print(
+            f"raw frame {raw_bytes / 2**20:.1f} MB, largest chunk {chunk_bytes / 2**20:.2f} MB, "
+            f"streaming peak {peak / 2**20:.1f} MB -> {peak / raw_bytes:.2f}x raw "
+            f"(limit {limit / 2**20:.1f} MB = {limit / raw_bytes:.2f}x)"
+        )
+        if peak > limit:
+            print("FAIL: streaming peak memory above bound")
+            return 1
+        print("OK")
+        return 0
+
+    raw_bytes, peak = measure(args.stations, args.years)
+    ratio = (raw_bytes + peak) / raw_bytes
+    print(
+        f"raw {raw_bytes / 2**20:.1f} MB, peak extra {peak / 2**20:.1f} MB "
+        f"-> {ratio:.2f}x raw (limit {args.max_ratio:.2f}x)"
+    )
+    if ratio > args.max_ratio:
+        print("FAIL: peak memory above bound")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
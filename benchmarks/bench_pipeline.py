@@ -0,0 +1,177 @@
+"""
+Benchmark the pipeline stages on synthetic data at several scales.
+
+    python benchmarks/bench_pipeline.py                     # default scales
+    python benchmarks/bench_pipeline.py --scales 1x1,1x10   # STATIONSxYEARS
+    python benchmarks/bench_pipeline.py --compare benchmarks/results/abc1234.json
+
+Each stage is measured with the pipeline's own StageProfiler (wall time,
+tracemalloc peak) and reported as rows/second. Results are written to
+``benchmarks/results/<commit>.json`` so runs on different commits can be
+compared with ``--compare``. Output files go to a temporary directory; the
+tracked plots and reports are never touched.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+RESULTS_DIR = BENCH_DIR / "results"
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+import air_quality_pipeline as pipeline  # noqa: E402
+from profiling import StageProfiler  # noqa: E402
+from synthetic import generate_hourly  # noqa: E402
+
+DEFAULT_SCALES = "1x1,1x5,1x20,10x5"
+STAGES = [
+    "preprocess",
+    "add_aqi_columns",
+    "summarize",
+    "save_plots",
+    "persist_outputs",
+    "export_metrics",
+]
+
+
+def parse_scales(text: str) -> List[Tuple[int, float]]:
+    scales = []
+    for item in text.split(","):
+        stations, years = item.lower().split("x")
+        scales.append((int(stations), float(years)))
+    return scales
+
+
+def git_revision() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return out.stdout.strip() or "unknown"
+
+
+def redirect_outputs(workdir: Path) -> None:
+    """Point the pipeline's output paths at a scratch directory."""
+    pipeline.PLOTS_DIR = workdir / "plots"
+    pipeline.REPORTS_DIR = workdir / "reports"
+    pipeline.CLEAN_DATA_PATH = workdir / "cleaned_air_quality.csv"
+    pipeline.STATION_TABLE_PATH = pipeline.REPORTS_DIR / "stations.csv"
+    pipeline.REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def bench_scale(n_stations: int, years: float, seed: int) -> Dict[str, Any]:
+    raw = generate_hourly(n_stations=n_stations, years=years, seed=seed)
+    profiler = StageProfiler(trace_memory=True)
+    with profiler.stage("preprocess", rows_in=len(raw)) as rec:
+        clean = pipeline.preprocess(raw)
+        rec.rows_out = len(clean)
+    with profiler.stage("add_aqi_columns", rows_in=len(clean)) as rec:
+        clean = pipeline.add_aqi_columns(clean)
+        rec.rows_out = len(clean)
+    with profiler.stage("summarize", rows_in=len(clean)) as rec:
+        summaries = pipeline.summarize(clean)
+        rec.rows_out = sum(len(frame) for frame in summaries.values())
+    with profiler.stage("save_plots", rows_in=len(summaries["daily"])):
+        pipeline.save_plots(summaries["daily"], summaries["monthly"])
+    with profiler.stage("persist_outputs", rows_in=len(clean)):
+        pipeline.persist_outputs(clean, summaries)
+    with profiler.stage("export_metrics", rows_in=len(clean)):
+        pipeline.export_metrics(clean)
+    profiler.stop()
+    stages = {}
+    for rec in profiler.records:
+        stages[rec.name] = {
+            "wall_s": rec.wall_s,
+            "rows_in": rec.rows_in,
+            "rows_per_s": rec.rows_in / rec.wall_s if rec.wall_s > 0 else None,
+            "peak_mem_bytes": rec.alloc_peak_bytes,
+        }
+    return {
+        "stations": n_stations,
+        "years": years,
+        "raw_rows": len(raw),
+        "raw_bytes": int(raw.memory_usage(deep=True).sum()),
+        "stages": stages,
+    }
+
+
+def format_results(results: List[Dict[str, Any]], baseline: Optional[Dict[str, Any]]) -> str:
+    base_index = {}
+    if baseline:
+        for entry in baseline["scales"]:
+            base_index[(entry["stations"], entry["years"])] = entry["stages"]
+    header = f"{'scale':<10}{'stage':<18}{'rows':>12}{'wall s':>10}{'rows/s':>14}{'peak MB':>10}"
+    if baseline:
+        header += f"{'vs base':>10}"
+    lines = [header, "-" * len(header)]
+    for entry in results:
+        scale = f"{entry['stations']}x{entry['years']:g}"
+        base = base_index.get((entry["stations"], entry["years"]), {})
+        for name, stage in entry["stages"].items():
+            rate = stage["rows_per_s"]
+            peak = stage["peak_mem_bytes"]
+            line = (
+                f"{scale:<10}{name:<18}{stage['rows_in']:>12,}{stage['wall_s']:>10.3f}"
+                f"{(f'{rate:,.0f}' if rate else '-'):>14}"
+                f"{(f'{peak / 2**20:.1f}' if peak is not None else '-'):>10}"
+            )
+            if baseline:
+                previous = base.get(name)
+                speedup = (
+                    f"{previous['wall_s'] / stage['wall_s']:.2f}x"
+                    if previous and stage["wall_s"] > 0
+                    else "-"
+                )
+                line += f"{speedup:>10}"
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic data")
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help="comma list of STATIONSxYEARS")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", type=Path, help="previous results JSON to compare against")
+    parser.add_argument(
+        "--output", type=Path, help="results file (default: results/<commit>.json)"
+    )
+    args = parser.parse_args(argv)
+
+    revision = git_revision()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        redirect_outputs(Path(tmp))
+        for n_stations, years in parse_scales(args.scales):
+            print(f"Benchmarking {n_stations} station(s) × {years:g} year(s)…", flush=True)
+            results.append(bench_scale(n_stations, years, args.seed))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print(format_results(results, baseline))
+
+    output = args.output or RESULTS_DIR / f"{revision}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"revision": revision, "seed": args.seed, "scales": results}, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
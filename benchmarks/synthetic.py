@@ -0,0 +1,98 @@
+"""
+Deterministic synthetic hourly data shaped like ``fetch_hourly_data`` output.
+
+Frames follow the hourly schema (categorical station, float32
+concentrations); expects ``src/`` on ``sys.path`` like the benchmark scripts.
+
+Series combine a per-station baseline, a winter-heavy seasonal cycle, a
+morning/evening diurnal cycle and multi-day pollution episodes. Gaps are
+injected as isolated missing hours, multi-day outages (rows removed) and
+null values in single pollutant columns, mirroring what the API returns.
+"""
+
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from schema import apply_hourly_schema
+
+TIMEZONE = "Asia/Kolkata"
+
+# (baseline, diurnal amplitude, episode sensitivity) per pollutant
+_PROFILES = {
+    "pm25": (75.0, 0.35, 1.0),
+    "pm10": (130.0, 0.30, 0.9),
+    "co": (1.4, 0.40, 0.7),
+    "no2": (45.0, 0.45, 0.5),
+    "so2": (18.0, 0.20, 0.3),
+}
+
+
+def station_names(n_stations: int) -> List[str]:
+    return [f"STN{index:04d}" for index in range(n_stations)]
+
+
+def _station_frame(
+    rng: np.random.Generator, name: str, times: pd.DatetimeIndex, gap_rate: float
+) -> pd.DataFrame:
+    n = len(times)
+    hours = times.hour.to_numpy()
+    day_of_year = times.dayofyear.to_numpy()
+    day_index = (times.normalize() - times[0].normalize()).days.to_numpy()
+    n_days = int(day_index[-1]) + 1
+
+    seasonal = 1.0 + 0.55 * np.cos((day_of_year - 10) / 365.25 * 2 * np.pi)
+    # two traffic peaks (≈09:00 and ≈21:00) over a night-time inversion bump
+    diurnal = 0.6 * np.cos((hours - 9) / 24 * 4 * np.pi) + 0.4 * np.cos(
+        (hours - 2) / 24 * 2 * np.pi
+    )
+    # multi-day episodes: smoothed daily log-normal factor
+    daily = rng.normal(0.0, 0.35, n_days)
+    daily = np.convolve(daily, np.ones(4) / 4, mode="same")
+    episode = np.exp(daily)[day_index]
+
+    site = rng.uniform(0.6, 1.5)
+    data = {}
+    for pollutant, (baseline, amplitude, sensitivity) in _PROFILES.items():
+        noise = rng.lognormal(0.0, 0.12, n)
+        values = (
+            baseline * site * seasonal * (1 + amplitude * diurnal) * episode**sensitivity * noise
+        )
+        data[pollutant] = np.round(np.clip(values, 0, None), 3 if pollutant == "co" else 1)
+    pm25 = data["pm25"]
+    data["aqi_reference"] = np.round(np.clip(pm25 * 1.7 + 20, 0, 500))
+    df = pd.DataFrame(data)
+    df["datetime"] = times
+    df["station"] = name
+    df["timezone"] = TIMEZONE
+
+    # null values in single columns (sensor dropouts reported as null)
+    for pollutant in _PROFILES:
+        mask = rng.random(n) < gap_rate
+        df.loc[mask, pollutant] = np.nan
+    keep = rng.random(n) >= gap_rate / 2
+    # one or two multi-day outages per year with no rows at all
+    for _ in range(rng.integers(1, 3) * max(1, n_days // 365)):
+        start = int(rng.integers(0, max(1, n - 24)))
+        keep[start : start + int(rng.integers(24, 24 * 5))] = False
+    return df.loc[keep].reset_index(drop=True)
+
+
+def generate_hourly(
+    n_stations: int = 1,
+    years: float = 1.0,
+    start: str = "2019-01-01",
+    seed: int = 0,
+    gap_rate: float = 0.01,
+) -> pd.DataFrame:
+    """Long-format hourly readings for ``n_stations`` over ``years`` years."""
+    rng = np.random.default_rng(seed)
+    periods = int(round(years * 365.25 * 24))
+    times = pd.date_range(start, periods=periods, freq="h")
+    frames = [
+        _station_frame(rng, name, times, gap_rate) for name in station_names(n_stations)
+    ]
+    return apply_hourly_schema(pd.concat(frames, ignore_index=True))
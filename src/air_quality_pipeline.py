@@ -1,55 +1,196 @@
 """
 Air Quality Data Visualizer pipeline.
 
-This script downloads hourly pollutant concentrations for Delhi from the
-Open-Meteo Air Quality API, converts them to daily aggregates, computes AQI,
-and generates all assignment deliverables (CSV + plots + summary tables).
+This script downloads hourly pollutant concentrations for the stations in
+``data/stations.csv`` from the Open-Meteo Air Quality API, converts them to
+daily aggregates, computes AQI, and generates all assignment deliverables
+(CSV + plots + summary tables).
+
+Runs are incremental: only hours missing from the raw store are fetched,
+stages whose inputs did not change are served from the stage cache, and
+``--offline`` rebuilds everything from the store without network access.
+Summaries and metrics are kept per station; when ``us_epa`` is among the
+AQI standards, ``metrics.json`` also reports its mean absolute gap to the
+API's ``us_aqi`` reference. Daily means are fed to every standard as they
+are, even where a standard defines a 1-hour or 8-hour averaging period.
 """
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence
 
+import argparse
+import datetime as dt
 import json
-import math
+import re
 import textwrap
+import time
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import requests
+
+import aqi_engine
+import aqi_standards as aqi_standards_module
+import hourly_aqi as hourly_aqi_module
+import raw_store
+import schema
+import seasons as seasons_module
+
+# AQI_BREAKPOINTS, Breakpoint and compute_sub_index are re-exported so existing
+# imports from this module keep working.
+from aqi_engine import (  # noqa: F401
+    AQI_BREAKPOINTS,
+    DEFAULT_GAP_MODE,
+    GAP_MODES,
+    Breakpoint,
+    compute_sub_index,
+)
+from aqi_standards import (
+    AQI_STANDARDS,
+    compute_standards,
+    get_standard,
+    resolve_standards,
+    standard_tables,
+)
+from hourly_aqi import hourly_aqi
+from openmeteo_client import (
+    AIR_QUALITY_PATH,
+    API_BASE_URL,
+    OpenMeteoClient,
+    get_default_client,
+)
+from profiling import StageProfiler, StageRecord
+from raw_store import (
+    DateRange,
+    clear_spool,
+    iter_raw,
+    load_raw,
+    load_spool,
+    missing_ranges,
+    split_date_range,
+    spool_chunk,
+    store_fingerprint,
+    update_raw,
+)
+from response_cache import ResponseCache
+from seasons import SEASON_CALENDARS, get_calendar, season_labels
+from schema import CONCENTRATION_COLUMNS, apply_hourly_schema, station_table
+from stage_graph import Stage, StageCache, StageGraph, format_plan
+from stations import DEFAULT_STATIONS, Station, load_stations
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
+RAW_STORE_DIR = PROJECT_ROOT / "data" / "raw" / "hourly"
+# single-CSV raw dump written by earlier versions; imported into the store once
 RAW_DATA_PATH = PROJECT_ROOT / "data" / "raw" / "open_meteo_delhi_q1_2024_hourly.csv"
+RAW_DATA_TIMEZONE = "Asia/Kolkata"
+BACKFILL_SPOOL_DIR = PROJECT_ROOT / "data" / "raw" / "_backfill"
 CLEAN_DATA_PATH = PROJECT_ROOT / "cleaned_air_quality.csv"
 PLOTS_DIR = PROJECT_ROOT / "plots"
+# chart name -> fingerprint of the last render (see plotting.render_plots)
+PLOTS_MANIFEST_PATH = PLOTS_DIR / "manifest.json"
 REPORTS_DIR = PROJECT_ROOT / "reports"
+RUN_PROFILE_PATH = REPORTS_DIR / "run_profile.json"
+STATION_TABLE_PATH = REPORTS_DIR / "stations.csv"
+HOURLY_AQI_PATH = REPORTS_DIR / "hourly_aqi.parquet"
+STATIONS_PATH = PROJECT_ROOT / "data" / "stations.csv"
+CACHE_DIR = PROJECT_ROOT / "data" / "cache"
+STAGE_CACHE_DIR = PROJECT_ROOT / "data" / "stage_cache"
+CACHE_TTL_S = 6 * 3600
+CACHE_MAX_BYTES = 512 * 1024 * 1024
 
-CITY = "Delhi"
-LATITUDE = 28.6139
-LONGITUDE = 77.209
 START_DATE = "2024-01-01"
 END_DATE = "2024-03-31"
 POLLUTANTS = ["pm25", "pm10", "no2", "so2", "co"]
-API_URL = "https://air-quality-api.open-meteo.com/v1/air-quality"
+NS_PER_DAY = 86_400 * 10**9
+# raw-store columns read by preprocess and the later stages
+RAW_COLUMNS = [*POLLUTANTS, "aqi_reference"]
+API_URL = API_BASE_URL + AIR_QUALITY_PATH
+FETCH_WORKERS = 8
+# long ranges are requested in calendar-month chunks (pandas offset alias;
+# None requests each range in one call)
+CHUNK_FREQ: Optional[str] = "MS"
+# stored months of one station read per chunk by the streaming aggregation
+STREAM_CHUNK_MONTHS = 12
+# trailing days that are re-downloaded on every run because the provider
+# may still revise them
+REFRESH_DAYS = 2
+# AQI standards computed per run (names in aqi_standards.AQI_STANDARDS); the
+# first fills the AQI/dominant_pollutant columns, the others get suffixed ones
+AQI_STANDARD_NAMES: List[str] = ["cpcb"]
+# evaluate AQI through precomputed lookup grids (aqi_engine.LOOKUP_RESOLUTION)
+# instead of the exact breakpoint formula
+AQI_USE_LOOKUP = False
+# treatment of concentrations between breakpoint segments (aqi_engine.GAP_MODES)
+AQI_GAP_MODE = DEFAULT_GAP_MODE
+# season definitions used by the seasonal summary (seasons.SEASON_CALENDARS)
+SEASON_CALENDAR = "india"
+# processes rendering charts (None: one per CPU); charts for several stations
+# are independent and render in parallel
+PLOT_WORKERS: Optional[int] = None
+# slowest charts listed with their render times in the run summary
+PLOT_TIMES_SHOWN = 5
+# charts and summary tables whose absence makes a cached stage run again
+PLOT_FILES = [
+    "daily_aqi_trend.png",
+    "monthly_average_pm25.png",
+    "pm25_vs_pm10.png",
+    "pm_trends_subplots.png",
+]
+SUMMARY_NAMES = ["daily", "monthly", "seasonal"]
+# stages of the pipeline graph, in run order (see pipeline_stages)
+STAGE_NAMES = [
+    "fetch_hourly_data",
+    "load_raw",
+    "hourly_aqi",
+    "preprocess",
+    "preprocess_chunks",
+    "add_aqi_columns",
+    "summarize",
+    "save_plots",
+    "persist_outputs",
+    "export_metrics",
+]
+
+
+class StationFetchResult(NamedTuple):
+    """Long-format readings for all stations plus per-station failures."""
+
+    frame: pd.DataFrame
+    failures: Dict[str, str]
+    attempted: int  # stations with at least one chunk requested
+    elapsed_s: float
+
+    @property
+    def stations_per_second(self) -> Optional[float]:
+        """Stations fetched per second, or ``None`` when nothing was fetched."""
+        if self.attempted == 0:
+            return None
+        return self.attempted / self.elapsed_s if self.elapsed_s > 0 else float("inf")
+
+
+def configured_stations() -> List[Station]:
+    """Stations from ``STATIONS_PATH``, or the built-in Delhi site."""
+    if STATIONS_PATH.exists():
+        return load_stations(STATIONS_PATH)
+    return list(DEFAULT_STATIONS)
 
 
-def fetch_hourly_data() -> pd.DataFrame:
-    """Pull hourly air-quality readings for the configured city."""
+def _fetch_range(
+    client: OpenMeteoClient, station: Station, start_date: str, end_date: str
+) -> pd.DataFrame:
+    """Issue one Open-Meteo request and tidy the hourly block into the hourly schema."""
     params = {
-        "latitude": LATITUDE,
-        "longitude": LONGITUDE,
-        "start_date": START_DATE,
-        "end_date": END_DATE,
+        "latitude": station.latitude,
+        "longitude": station.longitude,
+        "start_date": start_date,
+        "end_date": end_date,
         "hourly": "pm2_5,pm10,carbon_monoxide,nitrogen_dioxide,sulphur_dioxide,us_aqi",
         "timeformat": "iso8601",
-        "timezone": "auto",
+        "timezone": station.timezone,
     }
-    print("Downloading hourly observations from Open-Meteo…")
-    response = requests.get(API_URL, params=params, timeout=60)
-    response.raise_for_status()
-    payload = response.json()
+    payload = client.get_json(AIR_QUALITY_PATH, params)
     hourly = payload.get("hourly")
     if not hourly:
         raise RuntimeError("Open-Meteo response did not include hourly data.")
@@ -67,126 +208,428 @@ def fetch_hourly_data() -> pd.DataFrame:
     )
     # Convert CO from µg/m³ (API default) to mg/m³ to align with CPCB breakpoints
     df["co"] = df["co"] / 1000.0
-    df["city"] = CITY
-    df["latitude"] = LATITUDE
-    df["longitude"] = LONGITUDE
-    return df
+    df["station"] = station.name
+    df["timezone"] = payload.get("timezone", "UTC")
+    return apply_hourly_schema(df)
+
+
+def fetch_hourly_data(
+    client: Optional[OpenMeteoClient] = None,
+    station: Optional[Station] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    chunk_freq: Optional[str] = CHUNK_FREQ,
+    max_workers: int = FETCH_WORKERS,
+) -> pd.DataFrame:
+    """Pull hourly air-quality readings for one station (default: the first configured one).
+
+    Requests go through ``client`` (the shared pooled client by default) and
+    cover ``START_DATE``..``END_DATE`` unless another range is given. Long
+    ranges are split into ``chunk_freq`` chunks, fetched in parallel and
+    stitched back in order.
+    """
+    client = client or get_default_client()
+    station = station or configured_stations()[0]
+    chunks = split_date_range(start_date or START_DATE, end_date or END_DATE, chunk_freq)
+    if len(chunks) == 1:
+        return _fetch_range(client, station, *chunks[0])
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as pool:
+        parts = list(pool.map(lambda chunk: _fetch_range(client, station, *chunk), chunks))
+    # chunks never overlap; de-duplicating on local time would drop the
+    # repeated hour of a DST fall-back day
+    return apply_hourly_schema(pd.concat(parts, ignore_index=True))
+
+
+def fetch_stations(
+    stations: Sequence[Station],
+    client: Optional[OpenMeteoClient] = None,
+    max_workers: int = FETCH_WORKERS,
+    ranges: Optional[Dict[str, List[DateRange]]] = None,
+    chunk_freq: Optional[str] = CHUNK_FREQ,
+    on_chunk: Optional[Callable[[Station, DateRange, pd.DataFrame], None]] = None,
+) -> StationFetchResult:
+    """Fetch all stations concurrently on a bounded thread pool.
+
+    ``ranges`` optionally limits each station to specific ``(start, end)``
+    date ranges (an empty list skips the station); by default the configured
+    range is fetched. Every range is split into ``chunk_freq`` chunks and all
+    (station, chunk) requests share one pool; ``on_chunk`` is called from the
+    calling thread as each chunk completes, which lets callers checkpoint
+    progress. The shared client enforces the global request rate. A failing
+    station is recorded in ``failures`` and does not abort the others.
+    """
+    client = client or get_default_client()
+    tasks = [
+        (station, chunk)
+        for station in stations
+        for start, end in (
+            ranges.get(station.name, []) if ranges is not None else [(START_DATE, END_DATE)]
+        )
+        for chunk in split_date_range(start, end, chunk_freq)
+    ]
+    print(
+        f"Downloading {len(tasks)} hourly chunk(s) for {len(stations)} station(s) "
+        "from Open-Meteo…"
+    )
+    started = time.perf_counter()
+    frames: Dict[int, pd.DataFrame] = {}
+    failures: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks) or 1))) as pool:
+        futures = {
+            pool.submit(_fetch_range, client, station, *chunk): position
+            for position, (station, chunk) in enumerate(tasks)
+        }
+        for future in as_completed(futures):
+            position = futures[future]
+            station, chunk = tasks[position]
+            try:
+                frames[position] = future.result()
+            except Exception as exc:  # isolate per-station failures
+                failures.setdefault(station.name, f"{type(exc).__name__}: {exc}")
+                continue
+            if on_chunk is not None:
+                on_chunk(station, chunk, frames[position])
+    elapsed = time.perf_counter() - started
+    ordered = [frames[position] for position in sorted(frames)]
+    frame = pd.DataFrame()
+    if ordered:
+        # per-chunk categoricals differ, so the schema is re-applied after concat
+        frame = apply_hourly_schema(pd.concat(ordered, ignore_index=True))
+    return StationFetchResult(
+        frame=frame,
+        failures=failures,
+        attempted=len({station.name for station, _ in tasks}),
+        elapsed_s=elapsed,
+    )
+
+
+def import_legacy_raw_csv() -> None:
+    """Seed an empty raw store from the single CSV older versions wrote."""
+    if RAW_STORE_DIR.exists() or not RAW_DATA_PATH.exists():
+        return
+    legacy = pd.read_csv(
+        RAW_DATA_PATH,
+        parse_dates=["datetime"],
+        dtype={col: "float32" for col in CONCENTRATION_COLUMNS},
+    )
+    if "station" not in legacy.columns and "city" in legacy.columns:
+        legacy = legacy.rename(columns={"city": "station"})
+    legacy = apply_hourly_schema(legacy)
+    print(f"Importing {len(legacy)} rows from {RAW_DATA_PATH.name} into the raw store…")
+    update_raw(RAW_STORE_DIR, legacy, default_timezone=RAW_DATA_TIMEZONE)
+
+
+def _interpolate_within_groups(values: np.ndarray, group_start: np.ndarray) -> np.ndarray:
+    """Linearly fill NaNs by position without crossing group boundaries.
+
+    ``group_start`` holds, for every row, the position of the first row of its
+    (contiguous) group. Leading/trailing gaps take the nearest valid value,
+    matching ``Series.interpolate(limit_direction="both")`` applied per group.
+    """
+    n = len(values)
+    positions = np.arange(n)
+    valid = ~np.isnan(values)
+    if valid.all() or n == 0:
+        return values
+    group_end = np.empty(n, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, group_start[1:] != group_start[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    group_end[:] = np.repeat(ends, np.diff(np.r_[starts, n]))
+
+    prev_pos = np.maximum.accumulate(np.where(valid, positions, -1))
+    next_pos = np.minimum.accumulate(np.where(valid, positions, n)[::-1])[::-1]
+    has_prev = prev_pos >= group_start
+    has_next = next_pos <= group_end
+
+    out = values.copy()
+    missing = ~valid
+    interior = missing & has_prev & has_next
+    lo, hi, x = prev_pos[interior], next_pos[interior], positions[interior]
+    # same operation order as np.interp, which Series.interpolate uses
+    slope = (values[hi] - values[lo]) / (hi - lo).astype(np.float64)
+    out[interior] = slope * (x - lo).astype(np.float64) + values[lo]
+    leading = missing & ~has_prev & has_next
+    out[leading] = values[next_pos[leading]]
+    trailing = missing & has_prev & ~has_next
+    out[trailing] = values[prev_pos[trailing]]
+    return out
+
+
+def _group_means(
+    values: np.ndarray, group_first_row: np.ndarray, group_sizes: np.ndarray
+) -> np.ndarray:
+    """NaN-skipping means of the contiguous row groups of ``values``.
+
+    Groups are summed position by position (the first row of every group,
+    then the second, ...) with the same Kahan compensation pandas'
+    groupby/resample ``mean`` uses, so results match it bit for bit. The
+    Python loop runs once per position (24 for hourly data grouped by day),
+    not once per row, and only ever holds one value per group, so float32
+    ``values`` are widened group by group rather than copied as a whole.
+    """
+    n_groups = len(group_first_row)
+    val = np.empty(n_groups)
+    sums = np.zeros(n_groups)
+    compensation = np.zeros(n_groups)
+    counts = np.zeros(n_groups, dtype=np.int64)
+    for position in range(int(group_sizes.max())):
+        val.fill(np.nan)
+        has_row = group_sizes > position
+        val[has_row] = values[group_first_row[has_row] + position]
+        present = ~np.isnan(val)
+        y = val - compensation
+        t = sums + y
+        comp = t - sums - y
+        # an infinite value makes the compensation NaN; pandas resets it to 0
+        comp[np.isnan(comp)] = 0.0
+        np.copyto(compensation, comp, where=present)
+        np.copyto(sums, t, where=present)
+        counts += present
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+
+class DailyGroups(NamedTuple):
+    """Per-``(station, day)`` means, before calendar filling and interpolation.
+
+    Groups are ordered by station code, then day.
+    """
+
+    station: np.ndarray  # int64 codes into ``stations``
+    day: np.ndarray  # int64 days since the epoch (local calendar days)
+    stations: pd.Index
+    means: Dict[str, np.ndarray]
+    has_station: bool
+
+
+def _daily_groups(raw_df: pd.DataFrame) -> DailyGroups:
+    """Reduce hourly rows to one mean per ``(station, day)`` and concentration column."""
+    has_station = "station" in raw_df.columns
+    # only concentrations are averaged; per-station attributes such as
+    # coordinates belong in the station table, not in daily means
+    numeric_cols = [col for col in raw_df.columns if col in CONCENTRATION_COLUMNS]
+    if not has_station:
+        station_codes, stations = np.zeros(len(raw_df), dtype=np.int8), pd.Index([""])
+    elif isinstance(raw_df["station"].dtype, pd.CategoricalDtype):
+        station_codes = raw_df["station"].cat.codes.to_numpy()
+        stations = raw_df["station"].cat.categories
+    else:
+        station_codes, stations = pd.factorize(raw_df["station"], sort=True)
+    timestamps = raw_df["datetime"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    # day numbers fit in 32 bits; the ufunc casts block by block
+    day = np.floor_divide(
+        timestamps, NS_PER_DAY, out=np.empty(len(timestamps), dtype=np.int32), casting="unsafe"
+    )
+
+    # The raw store yields rows sorted by (station, datetime); anything else
+    # is put in that order once through an index rather than a frame copy.
+    same_station = station_codes[1:] == station_codes[:-1]
+    in_order = bool(np.all(station_codes[1:] >= station_codes[:-1])) and bool(
+        np.all(~same_station | (day[1:] >= day[:-1]))
+    )
+    order = None
+    if not in_order:
+        order = np.lexsort((timestamps, station_codes))
+        station_codes = station_codes[order]
+        day = day[order]
+        same_station = station_codes[1:] == station_codes[:-1]
+    new_group = ~same_station
+    new_group |= day[1:] != day[:-1]
+    group_first_row = np.flatnonzero(np.r_[True, new_group])
+    del same_station, new_group
+    group_station = station_codes[group_first_row].astype(np.int64)
+    group_day = day[group_first_row].astype(np.int64)
+    del day
+
+    group_sizes = np.diff(np.r_[group_first_row, len(raw_df)])
+    means: Dict[str, np.ndarray] = {}
+    for col in numeric_cols:
+        values = raw_df[col].to_numpy()
+        if values.dtype.kind != "f":  # integer or nullable extension columns
+            values = raw_df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        if order is not None:
+            values = values[order]
+        means[col] = _group_means(values, group_first_row, group_sizes)
+    return DailyGroups(group_station, group_day, stations, means, has_station)
+
+
+def _daily_frame(groups: DailyGroups) -> pd.DataFrame:
+    """Lay daily means on complete per-station calendars and fill gaps."""
+    group_station, group_day = groups.station, groups.day
+    # complete per-station calendars, built without a Python loop over stations
+    n_groups = len(group_day)
+    starts_in_groups = np.flatnonzero(np.r_[True, group_station[1:] != group_station[:-1]])
+    first = group_day[starts_in_groups]
+    last = group_day[np.r_[starts_in_groups[1:], n_groups] - 1]
+    lengths = last - first + 1
+    starts = np.r_[0, np.cumsum(lengths)[:-1]]
+    grid_station = np.repeat(group_station[starts_in_groups], lengths)
+    grid_day = np.repeat(first, lengths) + (np.arange(lengths.sum()) - np.repeat(starts, lengths))
+    slot = np.repeat(starts - first, np.diff(np.r_[starts_in_groups, n_groups]))
+    slot += group_day
+
+    daily = pd.DataFrame(index=pd.RangeIndex(len(grid_day)))
+    for col, means in groups.means.items():
+        column = np.full(len(grid_day), np.nan)
+        column[slot] = means
+        daily[col] = column
+
+    group_start = np.repeat(starts, lengths)
+    for col in [col for col in POLLUTANTS if col in daily.columns]:
+        daily[col] = _interpolate_within_groups(
+            daily[col].to_numpy(dtype=np.float64), group_start
+        )
+    daily["date"] = grid_day.astype("datetime64[D]").astype("datetime64[ns]")
+    if groups.has_station:
+        daily["station"] = pd.Categorical.from_codes(grid_station, categories=groups.stations)
+    if "aqi_reference" in daily.columns:
+        daily["AQI_reference"] = daily.pop("aqi_reference")
+    return daily
 
 
 def preprocess(raw_df: pd.DataFrame) -> pd.DataFrame:
-    """Aggregate hourly readings to daily averages and clean missing values."""
-    hourly = raw_df.copy()
-    hourly = hourly.set_index("datetime")
-    daily = hourly.resample("D").mean(numeric_only=True).reset_index()
-    daily["date"] = daily["datetime"].dt.date
-    pollutant_cols = [col for col in POLLUTANTS if col in daily.columns]
-    for col in pollutant_cols:
-        daily[col] = daily[col].interpolate(limit_direction="both")
-    daily["AQI_reference"] = daily.pop("aqi_reference")
-    return daily.drop(columns=["datetime"])
-
-
-Breakpoint = Tuple[float, float, int, int]
-
-
-AQI_BREAKPOINTS: Dict[str, List[Breakpoint]] = {
-    "pm25": [
-        (0, 30, 0, 50),
-        (31, 60, 51, 100),
-        (61, 90, 101, 200),
-        (91, 120, 201, 300),
-        (121, 250, 301, 400),
-        (251, 500, 401, 500),
-    ],
-    "pm10": [
-        (0, 50, 0, 50),
-        (51, 100, 51, 100),
-        (101, 250, 101, 200),
-        (251, 350, 201, 300),
-        (351, 430, 301, 400),
-        (431, 600, 401, 500),
-    ],
-    "no2": [
-        (0, 40, 0, 50),
-        (41, 80, 51, 100),
-        (81, 180, 101, 200),
-        (181, 280, 201, 300),
-        (281, 400, 301, 400),
-        (401, 600, 401, 500),
-    ],
-    "so2": [
-        (0, 40, 0, 50),
-        (41, 80, 51, 100),
-        (81, 380, 101, 200),
-        (381, 800, 201, 300),
-        (801, 1600, 301, 400),
-        (1601, 2000, 401, 500),
-    ],
-    "co": [
-        (0.0, 1.0, 0, 50),
-        (1.1, 2.0, 51, 100),
-        (2.1, 10.0, 101, 200),
-        (10.1, 17.0, 201, 300),
-        (17.1, 34.0, 301, 400),
-        (34.1, 50.0, 401, 500),
-    ],
-}
-
-
-def compute_sub_index(value: float, breakpoints: List[Breakpoint]) -> float:
-    """Compute the pollutant sub-index using CPCB-style breakpoints."""
-    if value is None or (isinstance(value, float) and math.isnan(value)):
-        return np.nan
-    for conc_lo, conc_hi, aqi_lo, aqi_hi in breakpoints:
-        if value <= conc_hi:
-            return ((aqi_hi - aqi_lo) / (conc_hi - conc_lo)) * (value - conc_lo) + aqi_lo
-    # extend final segment when concentration exceeds final breakpoint
-    conc_lo, conc_hi, aqi_lo, aqi_hi = breakpoints[-1]
-    return ((aqi_hi - aqi_lo) / (conc_hi - conc_lo)) * (value - conc_lo) + aqi_lo
-
-
-def add_aqi_columns(df: pd.DataFrame) -> pd.DataFrame:
-    """Add AQI and dominant pollutant columns."""
-    df = df.copy()
-    sub_indices = {}
-    for pollutant, breakpoints in AQI_BREAKPOINTS.items():
-        if pollutant in df.columns:
-            sub_indices[pollutant] = df[pollutant].apply(
-                lambda value, bps=breakpoints: compute_sub_index(value, bps)
-            )
-    sub_df = pd.DataFrame(sub_indices)
-    df["AQI"] = sub_df.max(axis=1)
-    df["dominant_pollutant"] = sub_df.idxmax(axis=1)
+    """Aggregate hourly readings to daily averages and clean missing values.
+
+    All stations are aggregated in one grouped ``(station, day)`` mean; every
+    station gets a complete daily calendar between its first and last
+    reading, and pollutant gaps are interpolated within each station only.
+
+    ``raw_df`` is never copied or modified. Input already sorted by
+    ``(station, datetime)`` (as the raw store returns it) is grouped by
+    scanning for key changes, and each concentration column is reduced one at a
+    time, so peak extra memory stays a small fraction of the input.
+    """
+    if raw_df.empty:
+        raise ValueError("preprocess needs at least one hourly reading.")
+    return _daily_frame(_daily_groups(raw_df))
+
+
+def _combine_daily_groups(parts: List[DailyGroups]) -> DailyGroups:
+    """Concatenate per-chunk groups, re-coding stations against one index."""
+    stations = parts[0].stations
+    if all(part.stations.equals(stations) for part in parts):
+        codes = np.concatenate([part.station for part in parts])
+    else:
+        names = np.concatenate([part.stations.take(part.station) for part in parts])
+        codes, stations = pd.factorize(names, sort=True)
+    day = np.concatenate([part.day for part in parts])
+    order = np.lexsort((day, codes))
+    codes, day = codes[order].astype(np.int64), day[order]
+    if np.any((codes[1:] == codes[:-1]) & (day[1:] == day[:-1])):
+        raise ValueError(
+            "Chunks must arrive ordered by (station, datetime); "
+            "a station-day was split across non-adjacent chunks."
+        )
+    means = {
+        col: np.concatenate([part.means[col] for part in parts])[order] for col in parts[0].means
+    }
+    return DailyGroups(codes, day, stations, means, parts[0].has_station)
+
+
+def preprocess_chunks(chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """Streaming equivalent of :func:`preprocess` for inputs larger than memory.
+
+    ``chunks`` must arrive in ``(station, datetime)`` order, as
+    :func:`raw_store.iter_raw` yields them. Each chunk is reduced to
+    per-``(station, day)`` means as soon as it arrives; the rows of its last
+    station-day are held back and reduced together with the next chunk, so
+    a day split across a chunk boundary is averaged exactly as in memory.
+    Only one chunk plus the (24× smaller) daily means is held at a time, and
+    the result equals ``preprocess`` on the concatenated chunks.
+    """
+    parts: List[DailyGroups] = []
+    carry: Optional[pd.DataFrame] = None
+    for chunk in chunks:
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        if chunk.empty:
+            continue
+        timestamps = chunk["datetime"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        tail = timestamps // NS_PER_DAY == timestamps[-1] // NS_PER_DAY
+        if "station" in chunk.columns:
+            tail &= (chunk["station"] == chunk["station"].iloc[-1]).to_numpy()
+        carry = chunk[tail]
+        if not tail.all():
+            parts.append(_daily_groups(chunk[~tail]))
+    if carry is not None and not carry.empty:
+        parts.append(_daily_groups(carry))
+    if not parts:
+        raise ValueError("preprocess needs at least one hourly reading.")
+    return _daily_frame(_combine_daily_groups(parts))
+
+
+def add_aqi_columns(
+    df: pd.DataFrame,
+    copy: bool = True,
+    standards: Optional[Sequence[str]] = None,
+    lookup: Optional[bool] = None,
+    gap_mode: Optional[str] = None,
+) -> pd.DataFrame:
+    """Add AQI and dominant pollutant columns for each requested standard.
+
+    ``standards`` defaults to ``AQI_STANDARD_NAMES``. The first standard
+    fills ``AQI``/``dominant_pollutant``; every further one adds
+    ``AQI_<name>``/``dominant_pollutant_<name>``. All standards share one
+    conversion of the pollutant columns. ``lookup`` (default
+    ``AQI_USE_LOOKUP``) switches to the approximate lookup-table
+    evaluation and ``gap_mode`` (default ``AQI_GAP_MODE``) picks how
+    breakpoint gaps are handled. With ``copy=False`` the columns are
+    added to ``df`` itself, which the caller hands over instead of paying
+    for a full copy.
+    """
+    if copy:
+        df = df.copy()
+    selected = resolve_standards(standards or AQI_STANDARD_NAMES)
+    results = compute_standards(
+        df,
+        selected,
+        lookup=AQI_USE_LOOKUP if lookup is None else lookup,
+        gap_mode=gap_mode or AQI_GAP_MODE,
+    )
+    for position, standard in enumerate(selected):
+        suffix = "" if position == 0 else f"_{standard.name}"
+        aqi, dominant = results[standard.name]
+        df[f"AQI{suffix}"] = aqi
+        df[f"dominant_pollutant{suffix}"] = pd.Series(dominant, index=df.index)
     return df
 
 
 def seasonal_label(month: int) -> str:
     """Map month numbers to Indian season names."""
-    if month in (12, 1, 2):
-        return "Winter"
-    if month in (3, 4):
-        return "Summer"
-    if month in (5, 6, 7):
-        return "Monsoon"
-    if month in (8, 9, 10):
-        return "Post Monsoon"
-    return "Late Autumn"
-
-
-def summarize(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
-    """Produce daily, monthly, and seasonal summaries."""
-    full = df.copy()
-    full["date"] = pd.to_datetime(full["date"])
-    full = full.sort_values("date")
-    daily = full.set_index("date")
-    monthly = daily.resample("ME").mean(numeric_only=True)
-    monthly.index = monthly.index.to_period("M")
-    seasonal = full.copy()
-    seasonal["season"] = seasonal["date"].dt.month.apply(seasonal_label)
+    calendar = get_calendar("india")
+    return calendar.seasons[calendar.codes[month]]
+
+
+def summarize(df: pd.DataFrame, seasons: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """Produce daily, monthly, and seasonal summaries.
+
+    ``df`` is left untouched; the daily table shares its column data and is
+    only re-ordered (copied) when the dates are not already sorted. When
+    ``df`` has a ``station`` column the monthly and seasonal summaries are
+    computed per station, indexed by ``(station, date)`` and
+    ``(station, season)``, so stations are never averaged together.
+    ``seasons`` names the season calendar (default ``SEASON_CALENDAR``);
+    the seasonal summary lists its seasons in the calendar's order.
+    """
+    dates = pd.DatetimeIndex(pd.to_datetime(df["date"]), name="date")
+    daily = df.set_axis(dates, axis=0, copy=False)
+    del daily["date"]
+    if not dates.is_monotonic_increasing:
+        daily = daily.sort_index(kind="stable")
+    by_station = [daily["station"]] if "station" in daily.columns else []
+    monthly = daily.groupby(
+        [*by_station, daily.index.to_period("M")], observed=True
+    ).mean(numeric_only=True)
+    labels = pd.Series(
+        season_labels(daily.index.month, get_calendar(seasons or SEASON_CALENDAR)),
+        index=daily.index,
+        name="season",
+    )
     seasonal_summary = (
-        seasonal.groupby("season")[["AQI", "pm25", "pm10", "no2", "so2", "co"]]
+        daily.groupby([*by_station, labels], observed=False)[
+            ["AQI", "pm25", "pm10", "no2", "so2", "co"]
+        ]
         .mean(numeric_only=True)
-        .reindex(["Winter", "Summer", "Monsoon", "Post Monsoon", "Late Autumn"])
         .dropna(how="all", subset=["AQI", "pm25", "pm10"])
     )
     return {
@@ -196,72 +639,99 @@ def summarize(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
     }
 
 
-def save_plots(daily: pd.DataFrame, monthly: pd.DataFrame) -> None:
-    """Generate assignment-mandated visualizations."""
+def period_label(first: pd.Timestamp, last: pd.Timestamp) -> str:
+    """Short name for the days ``first``–``last`` in chart titles, e.g. ``Q1 2024``."""
+    first, last = first.normalize(), last.normalize()
+    for freq, fmt in (("M", "%b %Y"), ("Q", "Q%q %Y"), ("Y", "%Y")):
+        period = pd.Period(first, freq)
+        if period.start_time == first and period.end_time.normalize() == last:
+            return period.strftime(fmt)
+    return f"{first.day} {first:%b %Y} – {last.day} {last:%b %Y}"
+
+
+def _monthly_means(daily: pd.DataFrame) -> pd.DataFrame:
+    monthly = daily.resample("ME").mean(numeric_only=True)
+    monthly.index = monthly.index.to_period("M")
+    return monthly
+
+
+def plot_outputs() -> List[Path]:
+    """Chart files ``save_plots`` is expected to have written.
+
+    The top-level charts plus every chart named in the manifest of the last
+    render, which includes the per-station sets. Reads the manifest as plain
+    JSON so planning a run never imports matplotlib; without one, the
+    missing manifest itself marks the charts as stale.
+    """
+    paths = [PLOTS_DIR / name for name in PLOT_FILES]
+    try:
+        manifest = json.loads(PLOTS_MANIFEST_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return paths + [PLOTS_MANIFEST_PATH]
+    names = sorted(manifest) if isinstance(manifest, dict) else []
+    return paths + [PLOTS_DIR / name for name in names if name not in PLOT_FILES]
+
+
+def save_plots(
+    daily: pd.DataFrame, monthly: pd.DataFrame, workers: Optional[int] = None
+) -> Dict[str, Optional[float]]:
+    """Generate assignment-mandated visualizations.
+
+    With one station the four charts show that station. When ``daily`` holds
+    several, they show the mean over stations of each day, and every
+    station also gets its own set under ``plots/stations/``. Titles name
+    the stations and the period covered by ``daily``. Charts are rendered
+    on ``workers`` processes (default ``PLOT_WORKERS``) and the render time
+    of each, keyed by its path under ``PLOTS_DIR``, is returned. Charts
+    whose data and parameters match the manifest in ``PLOTS_DIR`` are not
+    re-rendered and have a time of ``None``.
+    """
+    # matplotlib is imported here rather than at module load so commands that
+    # never plot do not pay for it
+    from plotting import chart_jobs, render_plots
+
     PLOTS_DIR.mkdir(exist_ok=True, parents=True)
+    period = period_label(daily.index.min(), daily.index.max())
+    stations = daily["station"].unique() if "station" in daily.columns else []
+    if len(stations) > 1:
+        # one line per chart would otherwise jump between stations day by day
+        overall = daily.groupby(level="date").mean(numeric_only=True)
+        label = f"Mean of {len(stations)} stations ({period})"
+        jobs = chart_jobs(overall, _monthly_means(overall), PLOTS_DIR, label)
+        for station, frame in daily.groupby("station", observed=True, sort=True):
+            slug = re.sub(r"[^\w.-]+", "_", str(station))
+            jobs += chart_jobs(
+                frame,
+                _monthly_means(frame),
+                PLOTS_DIR,
+                f"{station} ({period})",
+                prefix=f"stations/{slug}/",
+            )
+    else:
+        label = f"{stations[0]} ({period})" if len(stations) else period
+        if isinstance(monthly.index, pd.MultiIndex):
+            monthly = monthly.droplevel("station")
+        jobs = chart_jobs(daily, monthly, PLOTS_DIR, label)
+    return render_plots(jobs, PLOT_WORKERS if workers is None else workers, PLOTS_MANIFEST_PATH)
+
 
-    # Line chart: Daily AQI trend
-    plt.figure(figsize=(12, 5))
-    plt.plot(daily.index, daily["AQI"], color="#d62728")
-    plt.title("Daily AQI Trend – Delhi (Q1 2024)")
-    plt.xlabel("Date")
-    plt.ylabel("AQI")
-    plt.grid(alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / "daily_aqi_trend.png", dpi=150)
-    plt.close()
-
-    # Bar chart: Monthly average PM2.5
-    plt.figure(figsize=(8, 5))
-    monthly_pm25 = monthly["pm25"]
-    monthly_pm25.plot(kind="bar", color="#1f77b4")
-    plt.title("Monthly Average PM2.5")
-    plt.ylabel("µg/m³")
-    plt.xlabel("Month")
-    plt.xticks(rotation=45, ha="right")
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / "monthly_average_pm25.png", dpi=150)
-    plt.close()
-
-    # Scatter plot: PM2.5 vs PM10
-    plt.figure(figsize=(6, 5))
-    plt.scatter(daily["pm25"], daily["pm10"], alpha=0.7, c=daily["AQI"], cmap="plasma")
-    plt.colorbar(label="AQI")
-    plt.xlabel("PM2.5 (µg/m³)")
-    plt.ylabel("PM10 (µg/m³)")
-    plt.title("PM2.5 vs PM10 Concentration")
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / "pm25_vs_pm10.png", dpi=150)
-    plt.close()
-
-    # Subplots: comparative daily PM2.5 & PM10
-    fig, axes = plt.subplots(2, 1, figsize=(12, 8), sharex=True)
-    axes[0].plot(daily.index, daily["pm25"], color="#2ca02c")
-    axes[0].set_title("Daily PM2.5")
-    axes[0].set_ylabel("µg/m³")
-    axes[0].grid(alpha=0.2)
-    axes[1].plot(daily.index, daily["pm10"], color="#ff7f0e")
-    axes[1].set_title("Daily PM10")
-    axes[1].set_ylabel("µg/m³")
-    axes[1].grid(alpha=0.2)
-    axes[1].set_xlabel("Date")
-    fig.suptitle("Particulate Matter Trends – Delhi (Q1 2024)", y=0.95, fontsize=14)
-    plt.tight_layout()
-    plt.savefig(PLOTS_DIR / "pm_trends_subplots.png", dpi=150)
-    plt.close()
-
-
-def persist_outputs(clean_df: pd.DataFrame, summaries: Dict[str, pd.DataFrame]) -> None:
-    """Write cleaned CSV and summary tables."""
+def persist_outputs(
+    clean_df: pd.DataFrame,
+    summaries: Dict[str, pd.DataFrame],
+    stations: Optional[pd.DataFrame] = None,
+) -> None:
+    """Write cleaned CSV, summary tables and the station dimension table."""
     clean_df.to_csv(CLEAN_DATA_PATH, index=False)
+    if stations is not None:
+        stations.to_csv(STATION_TABLE_PATH, index=False)
     summaries["daily"].reset_index().to_csv(REPORTS_DIR / "daily_summary.csv", index=False)
     summaries["monthly"].to_csv(REPORTS_DIR / "monthly_summary.csv")
     summaries["seasonal"].to_csv(REPORTS_DIR / "seasonal_summary.csv")
 
 
-def export_metrics(clean_df: pd.DataFrame) -> None:
-    """Store key metrics for the written report."""
-    stats = {
+def _aqi_metrics(clean_df: pd.DataFrame) -> Dict[str, object]:
+    dates = pd.to_datetime(clean_df["date"])
+    stats: Dict[str, object] = {
         "aqi_min": float(np.nanmin(clean_df["AQI"])),
         "aqi_max": float(np.nanmax(clean_df["AQI"])),
         "aqi_std": float(np.nanstd(clean_df["AQI"])),
@@ -269,35 +739,500 @@ def export_metrics(clean_df: pd.DataFrame) -> None:
         "pm25_mean": float(np.nanmean(clean_df["pm25"])),
         "pm10_mean": float(np.nanmean(clean_df["pm10"])),
         "pm25_pm10_corr": float(clean_df["pm25"].corr(clean_df["pm10"])),
-        "worst_day": clean_df.loc[clean_df["AQI"].idxmax(), "date"].isoformat(),
-        "best_day": clean_df.loc[clean_df["AQI"].idxmin(), "date"].isoformat(),
+        "worst_day": dates[clean_df["AQI"].idxmax()].date().isoformat(),
+        "best_day": dates[clean_df["AQI"].idxmin()].date().isoformat(),
     }
+    if "AQI_us_epa" in clean_df.columns and "AQI_reference" in clean_df.columns:
+        # the API's us_aqi is a US EPA index too; report how far ours is from it
+        gap = clean_df["AQI_us_epa"] - clean_df["AQI_reference"]
+        stats["aqi_us_epa_vs_reference_mae"] = float(np.nanmean(np.abs(gap)))
+    return stats
+
+
+def export_metrics(clean_df: pd.DataFrame) -> None:
+    """Store key metrics for the written report.
+
+    The top-level figures span every station-day; ``worst_day_station`` and
+    ``best_day_station`` name the station the extreme days belong to, and
+    ``stations`` holds the same metrics for each station on its own.
+    """
+    stats = _aqi_metrics(clean_df)
+    if "station" in clean_df.columns:
+        station = clean_df["station"]
+        stats["worst_day_station"] = str(station[clean_df["AQI"].idxmax()])
+        stats["best_day_station"] = str(station[clean_df["AQI"].idxmin()])
+        stats["stations"] = {
+            str(name): _aqi_metrics(frame)
+            for name, frame in clean_df.groupby("station", observed=True, sort=True)
+        }
     REPORTS_DIR.mkdir(parents=True, exist_ok=True)
     with open(REPORTS_DIR / "metrics.json", "w", encoding="utf-8") as f:
         json.dump(stats, f, indent=2)
 
 
-def main() -> None:
+def update_raw_store(stations: Sequence[Station], client: OpenMeteoClient) -> StationFetchResult:
+    """Download whatever the raw store is missing for ``stations``.
+
+    Besides the missing days, the last ``REFRESH_DAYS`` are fetched again
+    because the provider may still revise them. Ranges are split into
+    ``CHUNK_FREQ`` chunks fetched in parallel, and each finished chunk is
+    spooled under ``BACKFILL_SPOOL_DIR`` before it is merged, so an
+    interrupted multi-year backfill resumes from the completed chunks.
+    """
+    names = [station.name for station in stations]
+    import_legacy_raw_csv()
+    # chunks completed by an interrupted run are picked up from the spool
+    update_raw(RAW_STORE_DIR, load_spool(BACKFILL_SPOOL_DIR))
+    clear_spool(BACKFILL_SPOOL_DIR)
+    # the timezone lets missing_ranges expect each station's real local hours
+    stored = load_raw(RAW_STORE_DIR, names, START_DATE, END_DATE, columns=["timezone"])
+    ranges = missing_ranges(
+        stored,
+        names,
+        START_DATE,
+        END_DATE,
+        refresh_from=dt.date.today() - dt.timedelta(days=REFRESH_DAYS),
+    )
+    fetched = fetch_stations(
+        stations,
+        client=client,
+        ranges=ranges,
+        on_chunk=lambda station, chunk, frame: spool_chunk(
+            BACKFILL_SPOOL_DIR, station.name, chunk, frame
+        ),
+    )
+    for name, reason in fetched.failures.items():
+        print(f"  ! {name}: {reason}")
+    update_raw(RAW_STORE_DIR, fetched.frame)
+    clear_spool(BACKFILL_SPOOL_DIR)
+    return fetched
+
+
+def load_stored_raw(
+    stations: Sequence[str], columns: Sequence[str] = RAW_COLUMNS
+) -> pd.DataFrame:
+    """Read the configured window from the local raw store without network access.
+
+    Only the partitions for ``stations`` and the columns the later stages use
+    are decoded; Parquet supplies typed columns and parsed timestamps.
+    """
+    import_legacy_raw_csv()
+    raw_df = load_raw(RAW_STORE_DIR, stations, START_DATE, END_DATE, columns=columns)
+    if raw_df.empty:
+        raise RuntimeError("No raw data stored for the configured stations and dates.")
+    return raw_df
+
+
+def aggregate_stored_raw(stations: Sequence[str]) -> pd.DataFrame:
+    """Daily frame for the configured window, streamed from the raw store.
+
+    Same result as ``preprocess(load_stored_raw(stations))`` while holding at
+    most ``STREAM_CHUNK_MONTHS`` months of one station's hourly rows.
+    """
+    import_legacy_raw_csv()
+    chunks = iter_raw(
+        RAW_STORE_DIR,
+        stations,
+        START_DATE,
+        END_DATE,
+        columns=RAW_COLUMNS,
+        chunk_months=STREAM_CHUNK_MONTHS,
+    )
+    return preprocess_chunks(chunks)
+
+
+def pipeline_stages(
+    stations: Sequence[Station],
+    extra_lines: List[str],
+    offline: bool = False,
+    streaming: bool = False,
+    with_hourly_aqi: bool = False,
+    aqi_standards: Optional[Sequence[str]] = None,
+    aqi_lookup: Optional[bool] = None,
+    aqi_gap_mode: Optional[str] = None,
+    seasons: Optional[str] = None,
+) -> List[Stage]:
+    """The pipeline as a stage graph (see :mod:`stage_graph`), in run order.
+
+    Stage functions append their lines for the run summary to
+    ``extra_lines``. Each stage lists the code its output depends on, so
+    editing e.g. chart styling only invalidates ``save_plots``.
+    """
+    names = [station.name for station in stations]
+    gap_mode = aqi_gap_mode or AQI_GAP_MODE
+    stages: List[Stage] = []
+
+    def fetch(rec: StageRecord) -> None:
+        cache = ResponseCache(CACHE_DIR, ttl_s=CACHE_TTL_S, max_bytes=CACHE_MAX_BYTES)
+        with OpenMeteoClient(cache=cache) as client:
+            fetched = update_raw_store(stations, client)
+        rec.rows_out = len(fetched.frame)
+        rate = fetched.stations_per_second
+        rec.extra["stations_per_second"] = rate
+        cache_stats = cache.stats()
+        rec.extra["response_cache"] = cache_stats
+        extra_lines.extend(
+            [
+                "  • Fetch throughput -> "
+                + (f"{rate:.2f} stations/s" if rate is not None else "nothing to fetch"),
+                f"  • Response cache -> {cache_stats['hits']} hits, "
+                f"{cache_stats['misses']} misses",
+            ]
+        )
+
+    def load(rec: StageRecord) -> pd.DataFrame:
+        # hourly windows run on UTC hours, which need each station's timezone
+        columns = [*RAW_COLUMNS, "timezone"] if with_hourly_aqi else RAW_COLUMNS
+        raw_df = load_stored_raw(names, columns)
+        rec.rows_out = len(raw_df)
+        return raw_df
+
+    def hourly(rec: StageRecord, raw_df: pd.DataFrame) -> None:
+        rec.rows_in = len(raw_df)
+        tables = standard_tables(get_standard("cpcb"), gap_mode)
+        frame = hourly_aqi(raw_df, tables=tables)
+        frame.to_parquet(HOURLY_AQI_PATH, index=False)
+        rec.rows_out = len(frame)
+        extra_lines.append(f"  • Hourly AQI -> {HOURLY_AQI_PATH}")
+
+    def daily(rec: StageRecord, raw_df: pd.DataFrame) -> pd.DataFrame:
+        rec.rows_in = len(raw_df)
+        clean_df = preprocess(raw_df)
+        rec.rows_out = len(clean_df)
+        return clean_df
+
+    def daily_streamed(rec: StageRecord) -> pd.DataFrame:
+        clean_df = aggregate_stored_raw(names)
+        rec.rows_out = len(clean_df)
+        return clean_df
+
+    def aqi(rec: StageRecord, clean_df: pd.DataFrame) -> pd.DataFrame:
+        rec.rows_in = len(clean_df)
+        # the cached daily frame was already written, so it can be extended in place
+        clean_df = add_aqi_columns(
+            clean_df, copy=False, standards=aqi_standards, lookup=aqi_lookup, gap_mode=gap_mode
+        )
+        rec.rows_out = len(clean_df)
+        return clean_df
+
+    def summaries(rec: StageRecord, clean_df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        rec.rows_in = len(clean_df)
+        result = summarize(clean_df, seasons)
+        rec.rows_out = sum(len(frame) for frame in result.values())
+        return result
+
+    def plots(rec: StageRecord, result: Dict[str, pd.DataFrame]) -> Dict[str, Optional[float]]:
+        rec.rows_in = len(result["daily"])
+        render_s = save_plots(result["daily"], result["monthly"])
+        rec.extra["render_s"] = render_s
+        rendered = {name: seconds for name, seconds in render_s.items() if seconds is not None}
+        extra_lines.append(
+            f"  • Charts rendered -> {len(rendered)} "
+            f"({sum(rendered.values()):.2f} s of render time), "
+            f"{len(render_s) - len(rendered)} unchanged"
+        )
+        slowest = sorted(rendered.items(), key=lambda item: item[1], reverse=True)
+        extra_lines.extend(
+            f"      {name:<44}{seconds:>7.3f} s" for name, seconds in slowest[:PLOT_TIMES_SHOWN]
+        )
+        return render_s
+
+    def persist(
+        rec: StageRecord, clean_df: pd.DataFrame, result: Dict[str, pd.DataFrame]
+    ) -> None:
+        rec.rows_in = len(clean_df)
+        persist_outputs(clean_df, result, station_table(stations))
+
+    def metrics(rec: StageRecord, clean_df: pd.DataFrame) -> None:
+        rec.rows_in = len(clean_df)
+        export_metrics(clean_df)
+
+    def raw_params() -> Dict[str, object]:
+        return {"stations": names, "start": START_DATE, "end": END_DATE, "columns": RAW_COLUMNS}
+
+    def raw_fingerprint() -> str:
+        return store_fingerprint(RAW_STORE_DIR)
+
+    daily_code = (
+        _interpolate_within_groups,
+        _group_means,
+        DailyGroups,
+        _daily_groups,
+        _daily_frame,
+        preprocess,
+    )
+    if not offline:
+        stages.append(Stage("fetch_hourly_data", fetch, always=True))
+    if streaming:
+        stages.append(
+            Stage(
+                "preprocess_chunks",
+                daily_streamed,
+                code=(
+                    *daily_code,
+                    _combine_daily_groups,
+                    preprocess_chunks,
+                    aggregate_stored_raw,
+                    raw_store,
+                ),
+                params=lambda: {**raw_params(), "chunk_months": STREAM_CHUNK_MONTHS},
+                fingerprint=raw_fingerprint,
+            )
+        )
+        daily_stage = "preprocess_chunks"
+    else:
+        stages.append(
+            Stage(
+                "load_raw",
+                load,
+                code=(load_stored_raw, raw_store, schema),
+                params=raw_params,
+                fingerprint=raw_fingerprint,
+                cache=False,
+            )
+        )
+        if with_hourly_aqi:
+            stages.append(
+                Stage(
+                    "hourly_aqi",
+                    hourly,
+                    inputs=("load_raw",),
+                    code=(hourly_aqi_module, aqi_engine, aqi_standards_module),
+                    params=lambda: {"gap_mode": gap_mode},
+                    outputs=lambda: [HOURLY_AQI_PATH],
+                )
+            )
+        stages.append(Stage("preprocess", daily, inputs=("load_raw",), code=daily_code))
+        daily_stage = "preprocess"
+    stages.extend(
+        [
+            Stage(
+                "add_aqi_columns",
+                aqi,
+                inputs=(daily_stage,),
+                code=(add_aqi_columns, aqi_engine, aqi_standards_module),
+                params=lambda: {
+                    "standards": list(aqi_standards or AQI_STANDARD_NAMES),
+                    "lookup": AQI_USE_LOOKUP if aqi_lookup is None else aqi_lookup,
+                    "gap_mode": gap_mode,
+                },
+            ),
+            Stage(
+                "summarize",
+                summaries,
+                inputs=("add_aqi_columns",),
+                code=(summarize, seasons_module),
+                params=lambda: {"seasons": seasons or SEASON_CALENDAR},
+            ),
+            Stage(
+                "save_plots",
+                plots,
+                inputs=("summarize",),
+                # by module name: importing plotting would load matplotlib
+                code=(save_plots, period_label, _monthly_means, "plotting", "downsample"),
+                outputs=plot_outputs,
+            ),
+            Stage(
+                "persist_outputs",
+                persist,
+                inputs=("add_aqi_columns", "summarize"),
+                code=(persist_outputs, station_table),
+                params=lambda: [list(station) for station in stations],
+                outputs=lambda: [
+                    CLEAN_DATA_PATH,
+                    STATION_TABLE_PATH,
+                    *(REPORTS_DIR / f"{name}_summary.csv" for name in SUMMARY_NAMES),
+                ],
+            ),
+            Stage(
+                "export_metrics",
+                metrics,
+                inputs=("add_aqi_columns",),
+                code=(export_metrics, _aqi_metrics),
+                outputs=lambda: [REPORTS_DIR / "metrics.json"],
+            ),
+        ]
+    )
+    return stages
+
+
+def run_pipeline(
+    offline: bool = False,
+    trace_memory: bool = True,
+    streaming: bool = False,
+    with_hourly_aqi: bool = False,
+    aqi_standards: Optional[Sequence[str]] = None,
+    aqi_lookup: Optional[bool] = None,
+    aqi_gap_mode: Optional[str] = None,
+    seasons: Optional[str] = None,
+    force: Sequence[str] = (),
+    dry_run: bool = False,
+) -> StageProfiler:
+    """Run the stage graph; ``offline`` replays from the raw store instead of fetching.
+
+    With ``streaming`` the hourly data is aggregated chunk by chunk instead of
+    being loaded whole, for stores larger than memory. ``with_hourly_aqi``
+    also writes the CPCB rolling-window hourly AQI to ``HOURLY_AQI_PATH``
+    (not available together with ``streaming``). ``aqi_standards`` overrides
+    ``AQI_STANDARD_NAMES``, ``aqi_lookup`` ``AQI_USE_LOOKUP``,
+    ``aqi_gap_mode`` ``AQI_GAP_MODE`` and ``seasons`` ``SEASON_CALENDAR``
+    for this run.
+
+    Stage outputs are cached in ``STAGE_CACHE_DIR`` and reused while their
+    inputs, parameters and code are unchanged; ``force`` names stages to
+    recompute together with everything downstream of them (``"all"`` for
+    every stage). ``dry_run`` only prints which stages would run. Each stage
+    is timed and its memory use recorded; the profile is printed and
+    written to ``RUN_PROFILE_PATH``.
+    """
+    if streaming and with_hourly_aqi:
+        raise ValueError("hourly AQI needs the in-memory path; drop streaming.")
+    profiler = StageProfiler(trace_memory=trace_memory and not dry_run)
+    stations = configured_stations()
+    extra_lines: List[str] = []
+    graph = StageGraph(
+        pipeline_stages(
+            stations,
+            extra_lines,
+            offline=offline,
+            streaming=streaming,
+            with_hourly_aqi=with_hourly_aqi,
+            aqi_standards=aqi_standards,
+            aqi_lookup=aqi_lookup,
+            aqi_gap_mode=aqi_gap_mode,
+            seasons=seasons,
+        ),
+        StageCache(STAGE_CACHE_DIR),
+    )
+    force = list(graph.stages) if "all" in force else list(force)
+    unknown = [name for name in force if name not in graph.stages]
+    if unknown:
+        raise ValueError(f"Stage(s) not part of this run: {', '.join(unknown)}")
+    if dry_run:
+        print(format_plan(graph.plan(force)))
+        return profiler
     REPORTS_DIR.mkdir(exist_ok=True, parents=True)
-    RAW_DATA_PATH.parent.mkdir(parents=True, exist_ok=True)
-    print("Starting Open-Meteo pipeline…")
-    raw_df = fetch_hourly_data()
-    raw_df.to_csv(RAW_DATA_PATH, index=False)
-    clean_df = preprocess(raw_df)
-    clean_df = add_aqi_columns(clean_df)
-    summaries = summarize(clean_df)
-    save_plots(summaries["daily"], summaries["monthly"])
-    persist_outputs(clean_df, summaries)
-    export_metrics(clean_df)
-    print(
-        textwrap.dedent(
-            f"""
-            Pipeline complete:
-              • Clean dataset -> {CLEAN_DATA_PATH}
-              • Plots saved -> {PLOTS_DIR}
-              • Summaries -> {REPORTS_DIR}
-            """
-        ).strip()
+    if offline:
+        print("Replaying pipeline from the local raw store…")
+    else:
+        print("Starting Open-Meteo pipeline…")
+    # seed the store before it is fingerprinted, so the first replay of a
+    # legacy CSV does not count as a change on the next run
+    import_legacy_raw_csv()
+    plan = graph.run(profiler, force)
+    profiler.stop()
+    profiler.write_json(RUN_PROFILE_PATH)
+    reused = sum(step.action == "cached" for step in plan)
+    ran = sum(step.action == "run" for step in plan)
+    extra_lines.append(f"  • Stage cache -> {reused} reused, {ran} run ({STAGE_CACHE_DIR})")
+    summary = textwrap.dedent(
+        f"""
+        Pipeline complete:
+          • Clean dataset -> {CLEAN_DATA_PATH}
+          • Plots saved -> {PLOTS_DIR}
+          • Summaries -> {REPORTS_DIR}
+          • Run profile -> {RUN_PROFILE_PATH}
+        """
+    ).strip()
+    print("\n".join([summary, *extra_lines]))
+    print()
+    print(profiler.format_table())
+    return profiler
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Air Quality Data Visualizer pipeline")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="skip the Open-Meteo download and replay from the local raw store",
+    )
+    parser.add_argument(
+        "--no-trace-memory",
+        action="store_true",
+        help="skip tracemalloc accounting in the run profile (lower overhead)",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="aggregate the raw store chunk by chunk instead of loading it whole",
+    )
+    parser.add_argument(
+        "--hourly-aqi",
+        action="store_true",
+        help="also write CPCB rolling-window hourly AQI (24 h means, 8 h CO max)",
+    )
+    parser.add_argument(
+        "--aqi-standards",
+        default=",".join(AQI_STANDARD_NAMES),
+        help=(
+            "comma-separated AQI standards to compute, first one primary "
+            f"(available: {', '.join(AQI_STANDARDS)})"
+        ),
+    )
+    parser.add_argument(
+        "--aqi-lookup",
+        action="store_true",
+        default=None,
+        help="evaluate AQI through precomputed lookup grids (faster, approximate)",
+    )
+    parser.add_argument(
+        "--aqi-gap-mode",
+        choices=GAP_MODES,
+        default=AQI_GAP_MODE,
+        help=(
+            "concentrations between breakpoint segments: interpolate across the "
+            "gap, truncate to table precision as CPCB does, or the legacy extend"
+        ),
+    )
+    parser.add_argument(
+        "--seasons",
+        choices=sorted(SEASON_CALENDARS),
+        default=SEASON_CALENDAR,
+        help="season calendar for the seasonal summary",
+    )
+    parser.add_argument(
+        "--force",
+        action="append",
+        default=[],
+        metavar="STAGE",
+        choices=[*STAGE_NAMES, "all"],
+        help=(
+            "recompute STAGE and everything downstream even if cached "
+            f"(repeatable; one of {', '.join(STAGE_NAMES)}, or all)"
+        ),
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="print which stages would run or be reused from the cache, then exit",
+    )
+    args = parser.parse_args(argv)
+    standards = [name.strip() for name in args.aqi_standards.split(",") if name.strip()]
+    unknown = [name for name in standards if name not in AQI_STANDARDS]
+    if unknown or not standards:
+        parser.error(f"unknown AQI standard(s): {', '.join(unknown) or '(none given)'}")
+    if args.streaming and args.hourly_aqi:
+        parser.error("--hourly-aqi cannot be combined with --streaming")
+    if args.streaming and {"load_raw", "preprocess"} & set(args.force):
+        parser.error("--streaming runs preprocess_chunks instead of load_raw/preprocess")
+    if not args.streaming and "preprocess_chunks" in args.force:
+        parser.error("preprocess_chunks only runs with --streaming")
+    if "hourly_aqi" in args.force and not args.hourly_aqi:
+        parser.error("--force hourly_aqi needs --hourly-aqi")
+    if args.offline and "fetch_hourly_data" in args.force:
+        parser.error("fetch_hourly_data does not run with --offline")
+    run_pipeline(
+        offline=args.offline,
+        trace_memory=not args.no_trace_memory,
+        streaming=args.streaming,
+        with_hourly_aqi=args.hourly_aqi,
+        aqi_standards=standards,
+        aqi_lookup=args.aqi_lookup,
+        aqi_gap_mode=args.aqi_gap_mode,
+        seasons=args.seasons,
+        force=args.force,
+        dry_run=args.dry_run,
     )
 
 
@@ -0,0 +1,407 @@
+"""
+Vectorized AQI sub-index engine.
+
+Breakpoint tables are compiled once into NumPy arrays so whole pollutant
+columns can be evaluated with a single segment lookup instead of a Python
+call per row.
+
+Published tables leave gaps between segments (PM2.5 30 → 31, CO 1.0 → 1.1).
+Tables are validated when compiled, and concentrations inside a gap are
+handled by one of ``GAP_MODES``:
+
+* ``"continuous"`` (default) – interpolate across the gap between the end
+  of one segment and the start of the next, so the sub-index is a
+  continuous function of concentration.
+* ``"truncate"`` – CPCB/EPA practice: truncate concentrations to the
+  table's precision (e.g. whole µg/m³ for PM2.5, 0.1 mg/m³ for CO) before
+  the lookup, so no value falls inside a gap.
+* ``"extend"`` – the original behaviour: a gap value uses the next segment
+  extended backwards, which yields sub-indices below that segment's start.
+
+For very large inputs an optional lookup-table mode precomputes sub-indices
+on a fine concentration grid and evaluates a column with one gather. Grid
+cells are right-closed like the breakpoint segments, so when every
+breakpoint lies on a cell edge the error against :func:`compute_sub_index`
+is at most half a cell times the steepest slope
+(:attr:`LookupTable.max_error`); otherwise the bound also includes the
+largest jump between adjacent segments. At the default resolution
+(0.01 µg/m³, 0.001 mg/m³ for CO) that is ≤ 0.017 AQI for CPCB PM2.5 and
+≤ 0.03 for CO.
+
+Importing this module loads NumPy only; pandas is imported on first use by
+the functions that build pandas results, so scripts that just evaluate
+sub-indices start quickly (``benchmarks/bench_import.py`` guards this).
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import math
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+Breakpoint = Tuple[float, float, int, int]
+
+
+AQI_BREAKPOINTS: Dict[str, List[Breakpoint]] = {
+    "pm25": [
+        (0, 30, 0, 50),
+        (31, 60, 51, 100),
+        (61, 90, 101, 200),
+        (91, 120, 201, 300),
+        (121, 250, 301, 400),
+        (251, 500, 401, 500),
+    ],
+    "pm10": [
+        (0, 50, 0, 50),
+        (51, 100, 51, 100),
+        (101, 250, 101, 200),
+        (251, 350, 201, 300),
+        (351, 430, 301, 400),
+        (431, 600, 401, 500),
+    ],
+    "no2": [
+        (0, 40, 0, 50),
+        (41, 80, 51, 100),
+        (81, 180, 101, 200),
+        (181, 280, 201, 300),
+        (281, 400, 301, 400),
+        (401, 600, 401, 500),
+    ],
+    "so2": [
+        (0, 40, 0, 50),
+        (41, 80, 51, 100),
+        (81, 380, 101, 200),
+        (381, 800, 201, 300),
+        (801, 1600, 301, 400),
+        (1601, 2000, 401, 500),
+    ],
+    "co": [
+        (0.0, 1.0, 0, 50),
+        (1.1, 2.0, 51, 100),
+        (2.1, 10.0, 101, 200),
+        (10.1, 17.0, 201, 300),
+        (17.1, 34.0, 301, 400),
+        (34.1, 50.0, 401, 500),
+    ],
+}
+
+
+GAP_MODES = ("continuous", "truncate", "extend")
+DEFAULT_GAP_MODE = "continuous"
+# absorbs representation error (2.3 * 10 == 22.999999999999996) when truncating
+_TRUNCATE_EPSILON = 1e-9
+
+
+class CompiledBreakpoints(NamedTuple):
+    """Breakpoint table unpacked into contiguous float64 arrays.
+
+    ``scale`` converts the pipeline's concentration units (µg/m³, CO in
+    mg/m³) into the units the table is written in. In ``"continuous"`` mode
+    the gaps are compiled in as extra segments; in ``"truncate"`` mode
+    ``truncate_decimals`` is the precision concentrations are cut to.
+    """
+
+    conc_lo: np.ndarray
+    conc_hi: np.ndarray
+    aqi_lo: np.ndarray
+    slope: np.ndarray
+    scale: float = 1.0
+    truncate_decimals: Optional[int] = None
+
+
+def find_gaps(breakpoints: List[Breakpoint]) -> List[Tuple[float, float]]:
+    """Validate a breakpoint table and return its ``(conc_hi, next conc_lo)`` gaps.
+
+    Raises ``ValueError`` for empty tables, segments that do not increase in
+    both concentration and index, and overlapping segments.
+    """
+    if not breakpoints:
+        raise ValueError("breakpoint table is empty")
+    gaps = []
+    for position, (conc_lo, conc_hi, aqi_lo, aqi_hi) in enumerate(breakpoints):
+        if not conc_hi > conc_lo or aqi_hi < aqi_lo:
+            raise ValueError(f"breakpoint segment {position} is not increasing")
+        if position == 0:
+            continue
+        prev_hi, prev_aqi_hi = breakpoints[position - 1][1], breakpoints[position - 1][3]
+        if conc_lo < prev_hi or aqi_lo < prev_aqi_hi:
+            raise ValueError(f"breakpoint segment {position} overlaps the previous one")
+        if conc_lo > prev_hi:
+            gaps.append((prev_hi, conc_lo))
+    return gaps
+
+
+def breakpoint_decimals(breakpoints: List[Breakpoint]) -> int:
+    """Decimal places the concentration breakpoints are written with."""
+    decimals = 0
+    for conc_lo, conc_hi, _, _ in breakpoints:
+        for value in (conc_lo, conc_hi):
+            while round(value, decimals) != value and decimals < 6:
+                decimals += 1
+    return decimals
+
+
+def _truncate(value, decimals: int):
+    factor = 10.0**decimals
+    if isinstance(value, np.ndarray):
+        return np.floor(value * factor + _TRUNCATE_EPSILON) / factor
+    return math.floor(value * factor + _TRUNCATE_EPSILON) / factor
+
+
+def _check_gap_mode(breakpoints: List[Breakpoint], gap_mode: str) -> List[Tuple[float, float]]:
+    if gap_mode not in GAP_MODES:
+        raise ValueError(f"Unknown gap mode {gap_mode!r} (expected one of {GAP_MODES})")
+    gaps = find_gaps(breakpoints)
+    if gap_mode == "truncate":
+        unit = 10.0 ** -breakpoint_decimals(breakpoints)
+        for hi, lo in gaps:
+            if not math.isclose(lo - hi, unit, rel_tol=1e-9):
+                raise ValueError(
+                    f"gap {hi} → {lo} is wider than the table precision {unit}; "
+                    "truncation cannot close it"
+                )
+    return gaps
+
+
+def _continuous_segments(breakpoints: List[Breakpoint]) -> List[Breakpoint]:
+    """Breakpoints with every gap filled by a segment joining its neighbours."""
+    segments = [breakpoints[0]]
+    for conc_lo, conc_hi, aqi_lo, aqi_hi in breakpoints[1:]:
+        prev_hi, prev_aqi_hi = segments[-1][1], segments[-1][3]
+        if conc_lo > prev_hi:
+            segments.append((prev_hi, conc_lo, prev_aqi_hi, aqi_lo))
+        segments.append((conc_lo, conc_hi, aqi_lo, aqi_hi))
+    return segments
+
+
+def compute_sub_index(
+    value: float, breakpoints: List[Breakpoint], gap_mode: str = DEFAULT_GAP_MODE
+) -> float:
+    """Compute the pollutant sub-index using CPCB-style breakpoints.
+
+    ``gap_mode`` selects how concentrations between two segments are
+    handled (see ``GAP_MODES``).
+    """
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return np.nan
+    _check_gap_mode(breakpoints, gap_mode)
+    if gap_mode == "continuous":
+        breakpoints = _continuous_segments(breakpoints)
+    elif gap_mode == "truncate":
+        value = _truncate(value, breakpoint_decimals(breakpoints))
+    for conc_lo, conc_hi, aqi_lo, aqi_hi in breakpoints:
+        if value <= conc_hi:
+            return ((aqi_hi - aqi_lo) / (conc_hi - conc_lo)) * (value - conc_lo) + aqi_lo
+    # extend final segment when concentration exceeds final breakpoint
+    conc_lo, conc_hi, aqi_lo, aqi_hi = breakpoints[-1]
+    return ((aqi_hi - aqi_lo) / (conc_hi - conc_lo)) * (value - conc_lo) + aqi_lo
+
+
+def compile_breakpoints(
+    breakpoints: List[Breakpoint], scale: float = 1.0, gap_mode: str = DEFAULT_GAP_MODE
+) -> CompiledBreakpoints:
+    """Validate and precompute segment bounds and slopes for one pollutant."""
+    _check_gap_mode(breakpoints, gap_mode)
+    truncate_decimals = None
+    if gap_mode == "continuous":
+        breakpoints = _continuous_segments(breakpoints)
+    elif gap_mode == "truncate":
+        truncate_decimals = breakpoint_decimals(breakpoints)
+    # Slopes are computed with Python floats, exactly as compute_sub_index does,
+    # so the vectorized path stays bit-identical to the scalar one.
+    slopes = [
+        (aqi_hi - aqi_lo) / (conc_hi - conc_lo)
+        for conc_lo, conc_hi, aqi_lo, aqi_hi in breakpoints
+    ]
+    return CompiledBreakpoints(
+        conc_lo=np.array([bp[0] for bp in breakpoints], dtype=np.float64),
+        conc_hi=np.array([bp[1] for bp in breakpoints], dtype=np.float64),
+        aqi_lo=np.array([bp[2] for bp in breakpoints], dtype=np.float64),
+        slope=np.array(slopes, dtype=np.float64),
+        scale=scale,
+        truncate_decimals=truncate_decimals,
+    )
+
+
+COMPILED_BREAKPOINTS: Dict[str, CompiledBreakpoints] = {
+    pollutant: compile_breakpoints(bps) for pollutant, bps in AQI_BREAKPOINTS.items()
+}
+
+
+def evaluate_sub_index(values: np.ndarray, table: CompiledBreakpoints) -> np.ndarray:
+    """Evaluate sub-indices for a whole column of concentrations."""
+    values = np.asarray(values, dtype=np.float64)
+    if table.scale != 1.0:
+        values = values * table.scale
+    if table.truncate_decimals is not None:
+        values = _truncate(values, table.truncate_decimals)
+    # First segment whose upper bound is >= value; values beyond the last
+    # breakpoint fall back to (and extend) the final segment.
+    segment = np.searchsorted(table.conc_hi, values, side="left")
+    np.minimum(segment, len(table.conc_hi) - 1, out=segment)
+    result = table.slope[segment] * (values - table.conc_lo[segment]) + table.aqi_lo[segment]
+    result[np.isnan(values)] = np.nan
+    return result
+
+
+# lookup-grid cells per concentration unit (µg/m³; mg/m³ for CO)
+DEFAULT_LOOKUP_RESOLUTION = 100.0
+LOOKUP_RESOLUTION: Dict[str, float] = {"co": 1000.0}
+
+
+class LookupTable(NamedTuple):
+    """Sub-indices precomputed on a regular concentration grid.
+
+    Cell ``k`` covers ``((k - 1) / resolution, k / resolution]`` and holds
+    the exact sub-index at the cell midpoint (cell 0 holds the value at 0).
+    Concentrations outside the grid fall back to the exact evaluation.
+    """
+
+    values: np.ndarray
+    resolution: float
+    table: CompiledBreakpoints
+    max_error: float
+
+
+def _segment_jumps(table: CompiledBreakpoints) -> np.ndarray:
+    """Absolute sub-index jump at each inner breakpoint (table units)."""
+    hi = table.conc_hi[:-1]
+    left = table.slope[:-1] * (hi - table.conc_lo[:-1]) + table.aqi_lo[:-1]
+    right = table.slope[1:] * (hi - table.conc_lo[1:]) + table.aqi_lo[1:]
+    return np.abs(right - left)
+
+
+def build_lookup_table(table: CompiledBreakpoints, resolution: float) -> LookupTable:
+    """Precompute ``table`` on a grid of ``resolution`` cells per unit.
+
+    For a ``"truncate"`` table the grid holds the untruncated segments;
+    concentrations are truncated before they are looked up.
+    """
+    if resolution <= 0:
+        raise ValueError("resolution must be positive")
+    top = table.conc_hi[-1] / table.scale
+    n_cells = int(math.ceil(top * resolution))
+    midpoints = (np.arange(n_cells + 1, dtype=np.float64) - 0.5) / resolution
+    midpoints[0] = 0.0
+    values = evaluate_sub_index(midpoints, table._replace(truncate_decimals=None))
+    edges = np.concatenate([table.conc_lo, table.conc_hi]) / table.scale * resolution
+    aligned = bool(np.allclose(edges, np.round(edges), rtol=0.0, atol=1e-9))
+    max_error = float(np.max(np.abs(table.slope)) * table.scale / (2 * resolution))
+    jumps = _segment_jumps(table)
+    if not aligned and len(jumps):
+        max_error += float(jumps.max())
+    return LookupTable(values=values, resolution=resolution, table=table, max_error=max_error)
+
+
+def compile_lookup_tables(
+    tables: Dict[str, CompiledBreakpoints],
+    resolution: Union[float, Dict[str, float], None] = None,
+) -> Dict[str, LookupTable]:
+    """Lookup tables for every pollutant of ``tables``.
+
+    ``resolution`` is cells per concentration unit, either one value for all
+    pollutants or a per-pollutant mapping; by default ``LOOKUP_RESOLUTION``
+    with ``DEFAULT_LOOKUP_RESOLUTION`` for pollutants it does not list.
+    """
+    if resolution is None:
+        resolution = LOOKUP_RESOLUTION
+    lookups = {}
+    for pollutant, table in tables.items():
+        if isinstance(resolution, dict):
+            cells = resolution.get(pollutant, DEFAULT_LOOKUP_RESOLUTION)
+        else:
+            cells = resolution
+        lookups[pollutant] = build_lookup_table(table, cells)
+    return lookups
+
+
+def evaluate_sub_index_lookup(values: np.ndarray, lookup: LookupTable) -> np.ndarray:
+    """Approximate :func:`evaluate_sub_index` by indexing ``lookup``."""
+    values = np.asarray(values, dtype=np.float64)
+    table = lookup.table
+    if table.truncate_decimals is not None:
+        values = _truncate(values * table.scale, table.truncate_decimals) / table.scale
+        table = table._replace(truncate_decimals=None)
+    cell = np.ceil(values * lookup.resolution)
+    # NaN and out-of-grid concentrations compare False and go the exact way
+    inside = (cell >= 0) & (cell < len(lookup.values))
+    cell[~inside] = 0
+    result = lookup.values[cell.astype(np.intp)]
+    if not inside.all():
+        outside = ~inside
+        result[outside] = evaluate_sub_index(values[outside], table)
+    return result
+
+
+def available_pollutants(
+    df: pd.DataFrame, tables: Dict[str, CompiledBreakpoints] = COMPILED_BREAKPOINTS
+) -> List[str]:
+    """Pollutants with a breakpoint table that are present in ``df``."""
+    return [pollutant for pollutant in tables if pollutant in df.columns]
+
+
+def read_pollutant_columns(df: pd.DataFrame, pollutants: List[str]) -> Dict[str, np.ndarray]:
+    """Pollutant columns of ``df`` as float64 arrays, read once for reuse."""
+    return {
+        pollutant: df[pollutant].to_numpy(dtype=np.float64, na_value=np.nan)
+        for pollutant in pollutants
+        if pollutant in df.columns
+    }
+
+
+def compute_sub_indices(
+    df: pd.DataFrame,
+    tables: Dict[str, CompiledBreakpoints] = COMPILED_BREAKPOINTS,
+    columns: Optional[Dict[str, np.ndarray]] = None,
+    lookups: Optional[Dict[str, LookupTable]] = None,
+) -> np.ndarray:
+    """Return an (n_rows, n_pollutants) array of sub-indices.
+
+    Columns follow ``available_pollutants(df, tables)`` order. ``columns``
+    may supply arrays already read with :func:`read_pollutant_columns`, so
+    several tables can be evaluated without converting the frame again.
+    With ``lookups`` (see :func:`compile_lookup_tables`) sub-indices come
+    from the precomputed grids instead of the exact segment evaluation.
+    """
+    pollutants = available_pollutants(df, tables)
+    if columns is None:
+        columns = read_pollutant_columns(df, pollutants)
+    out = np.empty((len(df), len(pollutants)), dtype=np.float64)
+    for position, pollutant in enumerate(pollutants):
+        if lookups is not None:
+            out[:, position] = evaluate_sub_index_lookup(columns[pollutant], lookups[pollutant])
+        else:
+            out[:, position] = evaluate_sub_index(columns[pollutant], tables[pollutant])
+    return out
+
+
+def _categorical(codes: np.ndarray, pollutants: List[str]) -> pd.Categorical:
+    import pandas as pd
+
+    return pd.Categorical.from_codes(codes, categories=pollutants)
+
+
+def reduce_sub_indices(
+    sub_indices: np.ndarray, pollutants: List[str]
+) -> Tuple[np.ndarray, pd.Categorical]:
+    """Reduce a sub-index array to AQI and dominant pollutant in one pass.
+
+    Rows where every sub-index is NaN get a NaN AQI and a missing dominant
+    pollutant, matching ``DataFrame.max``/``idxmax`` with ``skipna``.
+    """
+    n_rows = sub_indices.shape[0]
+    if sub_indices.shape[1] == 0:
+        codes = np.full(n_rows, -1, dtype=np.int8)
+        return np.full(n_rows, np.nan), _categorical(codes, pollutants)
+    filled = np.where(np.isnan(sub_indices), -np.inf, sub_indices)
+    codes = filled.argmax(axis=1).astype(np.int8)
+    aqi = filled[np.arange(n_rows), codes]
+    missing = np.isneginf(aqi)
+    aqi[missing] = np.nan
+    codes[missing] = -1
+    return aqi, _categorical(codes, pollutants)
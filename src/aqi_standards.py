@@ -0,0 +1,230 @@
+"""
+Registry of AQI standards.
+
+Each standard bundles per-pollutant breakpoint tables, compiled once at
+import into the arrays :mod:`aqi_engine` evaluates, plus the unit factor
+from the pipeline's concentrations (µg/m³, CO in mg/m³) to the units the
+standard is published in. Built in:
+
+* ``cpcb`` – India's National AQI (``aqi_engine.AQI_BREAKPOINTS``).
+* ``us_epa`` – US EPA AQI (PM2.5 breakpoints as revised in 2024; NO2/SO2
+  in ppb, CO in ppm).
+* ``eu_caqi`` – the European Common Air Quality Index (CiteAIR grid, daily
+  PM bands), a 0–100 scale whose top band is extended linearly.
+
+Several standards can be evaluated in one pass with
+:func:`compute_standards`, which converts each pollutant column once and
+reuses it for every table, optionally through precomputed lookup grids.
+Registered standards are compiled with ``aqi_engine.DEFAULT_GAP_MODE``;
+other gap modes are compiled on first use and cached.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from aqi_engine import (
+    AQI_BREAKPOINTS,
+    DEFAULT_GAP_MODE,
+    Breakpoint,
+    CompiledBreakpoints,
+    LookupTable,
+    available_pollutants,
+    compile_breakpoints,
+    compile_lookup_tables,
+    compute_sub_indices,
+    read_pollutant_columns,
+    reduce_sub_indices,
+)
+
+# ppb per µg/m³ (and ppm per mg/m³) at 25 °C and 1 atm: 24.45 / molar mass
+NO2_UG_TO_PPB = 24.45 / 46.0055
+SO2_UG_TO_PPB = 24.45 / 64.066
+CO_MG_TO_PPM = 24.45 / 28.010
+
+
+class AQIStandard(NamedTuple):
+    """An AQI definition with its tables compiled for the vectorized engine."""
+
+    name: str
+    label: str
+    breakpoints: Dict[str, List[Breakpoint]]
+    tables: Dict[str, CompiledBreakpoints]
+
+
+def make_standard(
+    name: str,
+    label: str,
+    breakpoints: Dict[str, List[Breakpoint]],
+    scales: Optional[Dict[str, float]] = None,
+    gap_mode: str = DEFAULT_GAP_MODE,
+) -> AQIStandard:
+    """Compile ``breakpoints`` (in the standard's own units) into a standard.
+
+    ``scales`` maps pollutants to the factor converting pipeline units into
+    the table's units (default 1). Tables are validated as they compile.
+    """
+    scales = scales or {}
+    tables = {
+        pollutant: compile_breakpoints(bps, scales.get(pollutant, 1.0), gap_mode)
+        for pollutant, bps in breakpoints.items()
+    }
+    return AQIStandard(name, label, breakpoints, tables)
+
+
+US_EPA_BREAKPOINTS: Dict[str, List[Breakpoint]] = {
+    "pm25": [
+        (0.0, 9.0, 0, 50),
+        (9.1, 35.4, 51, 100),
+        (35.5, 55.4, 101, 150),
+        (55.5, 125.4, 151, 200),
+        (125.5, 225.4, 201, 300),
+        (225.5, 325.4, 301, 500),
+    ],
+    "pm10": [
+        (0, 54, 0, 50),
+        (55, 154, 51, 100),
+        (155, 254, 101, 150),
+        (255, 354, 151, 200),
+        (355, 424, 201, 300),
+        (425, 604, 301, 500),
+    ],
+    "no2": [
+        (0, 53, 0, 50),
+        (54, 100, 51, 100),
+        (101, 360, 101, 150),
+        (361, 649, 151, 200),
+        (650, 1249, 201, 300),
+        (1250, 2049, 301, 500),
+    ],
+    "so2": [
+        (0, 35, 0, 50),
+        (36, 75, 51, 100),
+        (76, 185, 101, 150),
+        (186, 304, 151, 200),
+        (305, 604, 201, 300),
+        (605, 1004, 301, 500),
+    ],
+    "co": [
+        (0.0, 4.4, 0, 50),
+        (4.5, 9.4, 51, 100),
+        (9.5, 12.4, 101, 150),
+        (12.5, 15.4, 151, 200),
+        (15.5, 30.4, 201, 300),
+        (30.5, 50.4, 301, 500),
+    ],
+}
+
+EU_CAQI_BREAKPOINTS: Dict[str, List[Breakpoint]] = {
+    "pm25": [(0, 10, 0, 25), (10, 20, 25, 50), (20, 30, 50, 75), (30, 60, 75, 100)],
+    "pm10": [(0, 15, 0, 25), (15, 30, 25, 50), (30, 50, 50, 75), (50, 100, 75, 100)],
+    "no2": [(0, 50, 0, 25), (50, 100, 25, 50), (100, 200, 50, 75), (200, 400, 75, 100)],
+    "so2": [(0, 50, 0, 25), (50, 100, 25, 50), (100, 350, 50, 75), (350, 500, 75, 100)],
+    # µg/m³
+    "co": [
+        (0, 5000, 0, 25),
+        (5000, 7500, 25, 50),
+        (7500, 10000, 50, 75),
+        (10000, 20000, 75, 100),
+    ],
+}
+
+AQI_STANDARDS: Dict[str, AQIStandard] = {}
+_TABLE_CACHE: Dict[Tuple[str, str], Dict[str, CompiledBreakpoints]] = {}
+_LOOKUP_CACHE: Dict[Tuple[str, str], Dict[str, LookupTable]] = {}
+
+
+def register_standard(standard: AQIStandard) -> None:
+    """Add (or replace) a standard in the registry."""
+    AQI_STANDARDS[standard.name] = standard
+    for cache in (_TABLE_CACHE, _LOOKUP_CACHE):
+        for key in [key for key in cache if key[0] == standard.name]:
+            del cache[key]
+
+
+def get_standard(name: str) -> AQIStandard:
+    try:
+        return AQI_STANDARDS[name]
+    except KeyError:
+        known = ", ".join(sorted(AQI_STANDARDS))
+        raise ValueError(f"Unknown AQI standard {name!r} (known: {known})") from None
+
+
+def resolve_standards(names: Iterable[str]) -> List[AQIStandard]:
+    """Look up standards by name, keeping order and dropping repeats."""
+    return [get_standard(name) for name in dict.fromkeys(names)]
+
+
+register_standard(make_standard("cpcb", "CPCB National AQI (India)", AQI_BREAKPOINTS))
+register_standard(
+    make_standard(
+        "us_epa",
+        "US EPA AQI",
+        US_EPA_BREAKPOINTS,
+        {"no2": NO2_UG_TO_PPB, "so2": SO2_UG_TO_PPB, "co": CO_MG_TO_PPM},
+    )
+)
+register_standard(
+    make_standard("eu_caqi", "EU Common Air Quality Index", EU_CAQI_BREAKPOINTS, {"co": 1000.0})
+)
+
+
+def standard_tables(
+    standard: AQIStandard, gap_mode: str = DEFAULT_GAP_MODE
+) -> Dict[str, CompiledBreakpoints]:
+    """``standard``'s tables compiled for ``gap_mode``, built once."""
+    if gap_mode == DEFAULT_GAP_MODE:
+        return standard.tables
+    key = (standard.name, gap_mode)
+    if key not in _TABLE_CACHE:
+        _TABLE_CACHE[key] = {
+            pollutant: compile_breakpoints(
+                standard.breakpoints[pollutant], table.scale, gap_mode
+            )
+            for pollutant, table in standard.tables.items()
+        }
+    return _TABLE_CACHE[key]
+
+
+def lookup_tables(
+    standard: AQIStandard, gap_mode: str = DEFAULT_GAP_MODE
+) -> Dict[str, LookupTable]:
+    """Lookup grids for ``standard`` at the default resolution, built once."""
+    key = (standard.name, gap_mode)
+    if key not in _LOOKUP_CACHE:
+        _LOOKUP_CACHE[key] = compile_lookup_tables(standard_tables(standard, gap_mode))
+    return _LOOKUP_CACHE[key]
+
+
+def compute_standards(
+    df: pd.DataFrame,
+    standards: Sequence[AQIStandard],
+    lookup: bool = False,
+    gap_mode: str = DEFAULT_GAP_MODE,
+) -> Dict[str, Tuple[np.ndarray, pd.Categorical]]:
+    """AQI and dominant pollutant of ``df`` under each standard.
+
+    Pollutant columns are converted to float64 once and shared by every
+    standard's tables. With ``lookup`` the sub-indices come from
+    :func:`lookup_tables` (approximate, see ``LookupTable.max_error``).
+    ``gap_mode`` selects how concentrations between breakpoint segments are
+    treated (see ``aqi_engine.GAP_MODES``).
+    """
+    pollutants = list(dict.fromkeys(p for std in standards for p in std.tables))
+    columns = read_pollutant_columns(df, pollutants)
+    results: Dict[str, Tuple[np.ndarray, pd.Categorical]] = {}
+    for standard in standards:
+        tables = standard_tables(standard, gap_mode)
+        sub_indices = compute_sub_indices(
+            df,
+            tables,
+            columns=columns,
+            lookups=lookup_tables(standard, gap_mode) if lookup else None,
+        )
+        results[standard.name] = reduce_sub_indices(
+            sub_indices, available_pollutants(df, tables)
+        )
+    return results
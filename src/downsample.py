@@ -0,0 +1,115 @@
+"""
+Point reduction for long line charts.
+
+A line drawn across ``w`` pixels cannot show more than ``w`` distinct
+columns, so series far longer than that are reduced before plotting:
+
+* :func:`min_max_indices` keeps the lowest and highest point of each of
+  ``n_buckets`` equal-count buckets. With one bucket per pixel column the
+  drawn line covers the same vertical extent as the full series, so every
+  peak (e.g. the worst day of a winter) stays visible.
+* :func:`lttb_indices` is Largest-Triangle-Three-Buckets: one point per
+  bucket, picked to maximise the triangle it forms with the previous pick
+  and the mean of the next bucket. It follows the series' shape with half
+  the points of min–max but does not guarantee every extreme.
+
+Both return sorted indices into the input. Buckets are laid out as rows of
+a NaN-padded matrix so each pass is a handful of whole-array operations;
+LTTB only loops over buckets (at most a few thousand) for its dependency
+on the previous pick. Buckets made only of missing values keep one NaN so
+gaps still break the line.
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+DOWNSAMPLE_METHODS = ("minmax", "lttb")
+
+
+def _bucket_matrix(values: np.ndarray, n_buckets: int) -> Tuple[np.ndarray, int]:
+    """``values`` padded with NaN and reshaped to ``n_buckets`` rows."""
+    size = -(-len(values) // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[: len(values)] = values
+    return padded.reshape(n_buckets, size), size
+
+
+def min_max_indices(y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """Indices of the minimum and maximum of each of ``n_buckets`` buckets."""
+    y = np.asarray(y, dtype=np.float64)
+    if n_buckets <= 0 or 2 * n_buckets >= len(y):
+        return np.arange(len(y))
+    matrix, size = _bucket_matrix(y, n_buckets)
+    missing = np.isnan(matrix)
+    offsets = np.arange(n_buckets) * size
+    lows = np.argmin(np.where(missing, np.inf, matrix), axis=1) + offsets
+    highs = np.argmax(np.where(missing, -np.inf, matrix), axis=1) + offsets
+    # an all-missing bucket yields its first index from both, which is NaN
+    # (or padding past the end, dropped below)
+    picked = np.unique(np.concatenate([lows, highs, [0, len(y) - 1]]))
+    return picked[picked < len(y)]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets selection of ``n_out`` points."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out < 3 or n_out >= n:
+        return np.arange(n)
+    # the first and last points are always kept; the rest form n_out - 2 buckets
+    n_buckets = n_out - 2
+    inner_x, size = _bucket_matrix(x[1:-1], n_buckets)
+    inner_y, _ = _bucket_matrix(y[1:-1], n_buckets)
+    valid = ~np.isnan(inner_y) & ~np.isnan(inner_x)
+    counts = valid.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_x = np.where(valid, inner_x, 0.0).sum(axis=1) / counts
+        mean_y = np.where(valid, inner_y, 0.0).sum(axis=1) / counts
+    # the anchor after the last bucket is the last point
+    next_x = np.r_[mean_x[1:], x[-1]]
+    next_y = np.r_[mean_y[1:], y[-1]]
+    picked = np.empty(n_out, dtype=np.intp)
+    picked[0], picked[-1] = 0, n - 1
+    prev_x, prev_y = x[0], y[0]
+    for bucket in range(n_buckets):
+        start = 1 + bucket * size
+        if counts[bucket] == 0:
+            picked[bucket + 1] = min(start, n - 2)
+            continue
+        bx, by = inner_x[bucket], inner_y[bucket]
+        cx, cy = next_x[bucket], next_y[bucket]
+        if np.isnan(cx) or np.isnan(cy):
+            cx, cy = bx[valid[bucket]].mean(), by[valid[bucket]].mean()
+        # twice the triangle area; the constant factor does not change the pick
+        area = np.abs((prev_x - cx) * (by - prev_y) - (prev_x - bx) * (cy - prev_y))
+        best = int(np.argmax(np.where(valid[bucket], area, -1.0)))
+        picked[bucket + 1] = start + best
+        prev_x, prev_y = bx[best], by[best]
+    return np.unique(picked)
+
+
+def downsample(
+    x: np.ndarray, y: np.ndarray, max_points: int, method: str = "minmax"
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Reduce ``(x, y)`` to about ``max_points`` points when it is longer.
+
+    ``x`` may be ``datetime64``; it is compared as integers and returned in
+    its own dtype. ``minmax`` uses ``max_points // 2`` buckets so its two
+    points per bucket stay within ``max_points``.
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(
+            f"Unknown downsample method {method!r} (expected one of {DOWNSAMPLE_METHODS})"
+        )
+    if len(y) <= max_points:
+        return x, y
+    if method == "minmax":
+        keep = min_max_indices(y, max_points // 2)
+    else:
+        x_numeric = x.view(np.int64) if np.issubdtype(x.dtype, np.datetime64) else x
+        keep = lttb_indices(x_numeric, y, max_points)
+    return x[keep], y[keep]
@@ -0,0 +1,195 @@
+"""
+Hourly AQI from rolling concentration windows, as CPCB defines it.
+
+Each hour's AQI uses, per pollutant, the average over the trailing 24 hours
+(PM2.5, PM10, NO2, SO2) or the maximum over the trailing 8 hours (CO),
+evaluated through the same breakpoint tables as the daily AQI. Windows are
+time-based: missing hours shrink the sample rather than stretching the
+window, and a window needs ``min_hours`` readings to count.
+
+Each station's readings are laid on a complete hourly grid, padded with
+empty hours in front so every window stays inside its own station. The grid
+runs in UTC hours when the frame carries a ``timezone`` column, so a DST
+fall-back day keeps both readings of its repeated hour and a spring-forward
+day gains no phantom empty hour; windows are true trailing 24 or 8 hours. Means
+come from differences of cumulative sums and maxima from block
+prefix/suffix maxima (van Herk/Gil-Werman), so each window costs O(1)
+whatever its length.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+from aqi_engine import (
+    COMPILED_BREAKPOINTS,
+    CompiledBreakpoints,
+    available_pollutants,
+    compute_sub_indices,
+    reduce_sub_indices,
+)
+
+NS_PER_HOUR = 3600 * 10**9
+
+
+class RollingWindow(NamedTuple):
+    """Trailing window used for one pollutant's hourly concentration."""
+
+    hours: int
+    reducer: str  # "mean" or "max"
+    min_hours: int
+
+
+# CPCB averaging periods; a 24-hour average needs at least 16 hourly values
+CPCB_WINDOWS: Dict[str, RollingWindow] = {
+    "pm25": RollingWindow(24, "mean", 16),
+    "pm10": RollingWindow(24, "mean", 16),
+    "no2": RollingWindow(24, "mean", 16),
+    "so2": RollingWindow(24, "mean", 16),
+    "co": RollingWindow(8, "max", 6),
+}
+# CPCB reports an AQI only when at least three pollutants are available and
+# one of them is PM2.5 or PM10
+CPCB_MIN_POLLUTANTS = 3
+CPCB_REQUIRED_ANY = ("pm25", "pm10")
+
+
+def _absolute_hours(raw_df: pd.DataFrame) -> np.ndarray:
+    """Hours since the epoch, in UTC when rows carry a ``timezone``.
+
+    Local wall-clock times are localized as the raw store does it: of a
+    repeated fall-back hour, the first occurrence per station is daylight
+    time. Without a ``timezone`` column the timestamps are used as they are.
+    """
+    local = raw_df["datetime"].to_numpy(dtype="datetime64[ns]")
+    if "timezone" not in raw_df.columns:
+        return local.view(np.int64) // NS_PER_HOUR
+    keys = [col for col in ("station", "datetime") if col in raw_df.columns]
+    first_seen = ~raw_df.duplicated(keys, keep="first").to_numpy()
+    hours = np.empty(len(raw_df), dtype=np.int64)
+    zones = raw_df.groupby("timezone", sort=False, observed=True).indices
+    for tz, rows in zones.items():
+        utc = pd.DatetimeIndex(local[rows]).tz_localize(
+            str(tz), ambiguous=first_seen[rows], nonexistent="shift_forward"
+        )
+        hours[rows] = utc.asi8 // NS_PER_HOUR
+    return hours
+
+
+def _hourly_grid(
+    raw_df: pd.DataFrame, pad: int
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Place rows on padded per-station hourly grids.
+
+    Returns ``(order, slot, size)``: rows taken in ``order`` (``None`` when
+    the input is already sorted by station and time) land at grid position
+    ``slot``; the grid has ``size`` hours.
+    """
+    hours = _absolute_hours(raw_df)
+    if "station" in raw_df.columns:
+        codes = pd.factorize(raw_df["station"], sort=True)[0]
+    else:
+        codes = np.zeros(len(raw_df), dtype=np.int64)
+    same_station = codes[1:] == codes[:-1]
+    in_order = bool(np.all(codes[1:] >= codes[:-1])) and bool(
+        np.all(~same_station | (hours[1:] > hours[:-1]))
+    )
+    order = None
+    if not in_order:
+        order = np.lexsort((hours, codes))
+        codes, hours = codes[order], hours[order]
+    first_rows = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    last_rows = np.r_[first_rows[1:], len(codes)] - 1
+    lengths = hours[last_rows] - hours[first_rows] + 1 + pad
+    segment_start = np.r_[0, np.cumsum(lengths)[:-1]]
+    rows_per_station = np.diff(np.r_[first_rows, len(codes)])
+    slot = np.repeat(segment_start + pad - hours[first_rows], rows_per_station) + hours
+    return order, slot, int(lengths.sum())
+
+
+def _rolling_mean(grid: np.ndarray, hours: int, min_hours: int) -> np.ndarray:
+    valid = ~np.isnan(grid)
+    sums = np.r_[0.0, np.cumsum(np.where(valid, grid, 0.0))]
+    counts = np.r_[0, np.cumsum(valid)]
+    window_sum = sums[hours:] - sums[:-hours]
+    window_count = counts[hours:] - counts[:-hours]
+    out = np.full(len(grid), np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = window_sum / window_count
+    out[hours - 1 :] = np.where(window_count >= min_hours, means, np.nan)
+    return out
+
+
+def _rolling_max(grid: np.ndarray, hours: int, min_hours: int) -> np.ndarray:
+    n = len(grid)
+    n_blocks = -(-n // hours)
+    padded = np.full(n_blocks * hours, -np.inf)
+    padded[:n] = np.where(np.isnan(grid), -np.inf, grid)
+    blocks = padded.reshape(n_blocks, hours)
+    prefix = np.maximum.accumulate(blocks, axis=1).ravel()
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    # window [i - hours + 1, i] = suffix of one block + prefix of the next
+    window_max = np.maximum(suffix[: n - hours + 1], prefix[hours - 1 : n])
+    counts = np.r_[0, np.cumsum(~np.isnan(grid))]
+    window_count = counts[hours:] - counts[:-hours]
+    out = np.full(n, np.nan)
+    out[hours - 1 :] = np.where(window_count >= min_hours, window_max, np.nan)
+    return out
+
+
+def rolling_concentrations(
+    raw_df: pd.DataFrame, windows: Dict[str, RollingWindow] = CPCB_WINDOWS
+) -> pd.DataFrame:
+    """Trailing-window concentration per station and hour.
+
+    The result has one row per input row, ordered by ``(station, datetime)``,
+    with each pollutant column replaced by its window value.
+    """
+    pollutants = [col for col in windows if col in raw_df.columns]
+    pad = max((windows[col].hours for col in pollutants), default=1) - 1
+    order, slot, size = _hourly_grid(raw_df, pad)
+    out = pd.DataFrame(index=pd.RangeIndex(len(raw_df)))
+    for key in ("station", "datetime"):
+        if key in raw_df.columns:
+            column = raw_df[key]
+            out[key] = column.to_numpy() if order is None else column.to_numpy()[order]
+    if "station" in out.columns:
+        out["station"] = out["station"].astype("category")
+    for col in pollutants:
+        window = windows[col]
+        values = raw_df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        grid = np.full(size, np.nan)
+        grid[slot] = values if order is None else values[order]
+        reducer = _rolling_mean if window.reducer == "mean" else _rolling_max
+        out[col] = reducer(grid, window.hours, window.min_hours)[slot]
+    return out
+
+
+def hourly_aqi(
+    raw_df: pd.DataFrame,
+    windows: Dict[str, RollingWindow] = CPCB_WINDOWS,
+    tables: Dict[str, CompiledBreakpoints] = COMPILED_BREAKPOINTS,
+    min_pollutants: int = CPCB_MIN_POLLUTANTS,
+) -> pd.DataFrame:
+    """Hourly AQI and dominant pollutant from rolling concentrations.
+
+    Hours with fewer than ``min_pollutants`` valid sub-indices, or with
+    neither PM2.5 nor PM10, get a missing AQI as CPCB prescribes.
+    """
+    if raw_df.empty:
+        raise ValueError("hourly_aqi needs at least one hourly reading.")
+    out = rolling_concentrations(raw_df, windows)
+    pollutants = available_pollutants(out, tables)
+    sub_indices = compute_sub_indices(out, tables)
+    aqi, dominant = reduce_sub_indices(sub_indices, pollutants)
+    valid = ~np.isnan(sub_indices)
+    required = [pollutants.index(p) for p in CPCB_REQUIRED_ANY if p in pollutants]
+    eligible = valid.sum(axis=1) >= min_pollutants
+    eligible &= valid[:, required].any(axis=1) if required else False
+    aqi[~eligible] = np.nan
+    out["AQI"] = aqi
+    out["dominant_pollutant"] = pd.Series(dominant, index=out.index).where(eligible)
+    return out
@@ -0,0 +1,237 @@
+"""
+Shared HTTP client for the Open-Meteo Air Quality API.
+
+All fetches go through one pooled ``requests.Session`` so TCP/TLS setup is
+paid once per host, and transient failures (connection errors, 429, 5xx)
+are retried with capped exponential backoff, full jitter and support for
+the ``Retry-After`` header. A server-requested wait is honoured in full; one
+longer than ``retry_after_max`` raises :class:`RetryAfterTooLong` instead of
+retrying early. An optional token bucket caps the global request
+rate across all threads sharing the client.
+
+``requests`` is imported when the first session is built, so commands that
+only read stored data never pay for it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+import datetime as dt
+import os
+import random
+import threading
+import time
+
+from response_cache import ResponseCache
+
+if TYPE_CHECKING:
+    import requests
+
+API_BASE_URL = os.environ.get(
+    "OPEN_METEO_BASE_URL", "https://air-quality-api.open-meteo.com"
+)
+AIR_QUALITY_PATH = "/v1/air-quality"
+
+
+@dataclass
+class ClientConfig:
+    """Connection, timeout and retry settings for :class:`OpenMeteoClient`."""
+
+    base_url: str = API_BASE_URL
+    timeout: float = 60.0
+    max_retries: int = 4
+    backoff_factor: float = 0.5
+    backoff_max: float = 30.0
+    pool_connections: int = 4
+    pool_maxsize: int = 16
+    retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504)
+    # longest Retry-After the client will sleep through before giving up
+    retry_after_max: float = 300.0
+    # Open-Meteo's free tier allows roughly 600 calls/minute; stay under it.
+    max_requests_per_second: Optional[float] = 8.0
+
+
+class RetryAfterTooLong(RuntimeError):
+    """The server asked for a longer wait than ``ClientConfig.retry_after_max``."""
+
+    def __init__(self, url: str, status: int, delay: float, limit: float) -> None:
+        super().__init__(
+            f"{url} returned {status} with Retry-After {delay:.0f} s, "
+            f"longer than retry_after_max ({limit:.0f} s); try again later"
+        )
+        self.url = url
+        self.status = status
+        self.delay = delay
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every request of a client."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until one request may be issued."""
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            self._sleep(wait)
+
+
+class OpenMeteoClient:
+    """Pooled, retrying client for Open-Meteo JSON endpoints."""
+
+    def __init__(
+        self,
+        config: Optional[ClientConfig] = None,
+        session: Optional[requests.Session] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        cache: Optional[ResponseCache] = None,
+    ) -> None:
+        self.config = config or ClientConfig()
+        self.session = session or self._build_session()
+        self._sleep = sleep
+        self.cache = cache
+        self._limiter = (
+            RateLimiter(self.config.max_requests_per_second)
+            if self.config.max_requests_per_second
+            else None
+        )
+
+    def _build_session(self) -> requests.Session:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.config.pool_connections,
+            pool_maxsize=self.config.pool_maxsize,
+            max_retries=0,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def get_json(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """GET ``path`` relative to the base URL and decode the JSON body.
+
+        When a response cache is attached it is consulted first and filled
+        with every successful payload, keyed by the full URL so different
+        servers never share entries.
+        """
+        url = self.config.base_url.rstrip("/") + path
+        if self.cache is not None:
+            cached = self.cache.get(url, params)
+            if cached is not None:
+                return cached
+        payload = self._request_json(url, params)
+        if self.cache is not None:
+            self.cache.put(url, params, payload)
+        return payload
+
+    def _request_json(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        import requests
+
+        attempt = 0
+        while True:
+            if self._limiter is not None:
+                self._limiter.acquire()
+            try:
+                response = self.session.get(url, params=params, timeout=self.config.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.config.max_retries:
+                    raise
+                self._sleep(self._backoff(attempt))
+            else:
+                if (
+                    response.status_code not in self.config.retry_statuses
+                    or attempt >= self.config.max_retries
+                ):
+                    response.raise_for_status()
+                    return response.json()
+                delay = _retry_after_seconds(response.headers.get("Retry-After"))
+                response.close()
+                if delay is None:
+                    delay = self._backoff(attempt)
+                elif delay > self.config.retry_after_max:
+                    # retrying sooner than asked would only spend the retry budget
+                    raise RetryAfterTooLong(
+                        url, response.status_code, delay, self.config.retry_after_max
+                    )
+                self._sleep(delay)
+            attempt += 1
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt."""
+        ceiling = min(self.config.backoff_max, self.config.backoff_factor * (2**attempt))
+        return random.uniform(0, ceiling)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "OpenMeteoClient":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def _retry_after_seconds(header: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header given as seconds or an HTTP date."""
+    if not header:
+        return None
+    header = header.strip()
+    if header.isdigit():
+        return float(header)
+    try:
+        when = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=dt.timezone.utc)
+    return max(0.0, (when - dt.datetime.now(dt.timezone.utc)).total_seconds())
+
+
+_default_client: Optional[OpenMeteoClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> OpenMeteoClient:
+    """Return the process-wide client, creating it on first use."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = OpenMeteoClient()
+        return _default_client
+
+
+def set_default_client(client: Optional[OpenMeteoClient]) -> None:
+    """Replace the process-wide client (``None`` resets to a fresh default)."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is not None and _default_client is not client:
+            _default_client.close()
+        _default_client = client
@@ -0,0 +1,192 @@
+"""
+Local stand-in for the Open-Meteo ``/v1/air-quality`` endpoint.
+
+Serves deterministic hourly readings in the same JSON shape as the real API
+so the client, fetchers and caches can be exercised without network access::
+
+    python src/openmeteo_stub.py --port 8765
+    OPEN_METEO_BASE_URL=http://127.0.0.1:8765 python src/air_quality_pipeline.py
+
+Values depend only on (latitude, longitude, timestamp), so overlapping or
+chunked requests always agree with each other.
+"""
+
+from __future__ import annotations
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import argparse
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+
+from openmeteo_client import AIR_QUALITY_PATH
+
+HOURLY_UNITS = {
+    "time": "iso8601",
+    "pm10": "μg/m³",
+    "pm2_5": "μg/m³",
+    "carbon_monoxide": "μg/m³",
+    "nitrogen_dioxide": "μg/m³",
+    "sulphur_dioxide": "μg/m³",
+    "us_aqi": "USAQI",
+}
+
+# (mean level, diurnal amplitude) per API variable
+_VARIABLE_SHAPES = {
+    "pm2_5": (80.0, 35.0),
+    "pm10": (135.0, 50.0),
+    "carbon_monoxide": (1400.0, 600.0),
+    "nitrogen_dioxide": (45.0, 20.0),
+    "sulphur_dioxide": (18.0, 6.0),
+}
+
+
+def synthetic_hourly(
+    latitude: float, longitude: float, start_date: str, end_date: str, variables: List[str]
+) -> Dict[str, List[Any]]:
+    """Build an Open-Meteo style ``hourly`` block for the requested range."""
+    times = pd.date_range(start_date, pd.Timestamp(end_date) + pd.Timedelta(hours=23), freq="h")
+    hours = times.hour.to_numpy()
+    day_of_year = times.dayofyear.to_numpy()
+    site = (abs(latitude) * 7.3 + abs(longitude) * 3.1) % 1.0
+    diurnal = np.cos((hours - 1) / 24.0 * 2 * np.pi)
+    seasonal = 1.0 + 0.4 * np.cos((day_of_year - 15) / 365.25 * 2 * np.pi)
+    # deterministic "weather" noise keyed on absolute hour
+    epoch_hours = (times.asi8 // 3_600_000_000_000).astype(np.int64)
+    noise = np.sin(epoch_hours * 12.9898 + site * 78.233) * 0.15
+    hourly: Dict[str, List[Any]] = {"time": times.strftime("%Y-%m-%dT%H:%M").tolist()}
+    for variable in variables:
+        if variable == "us_aqi":
+            pm25 = _VARIABLE_SHAPES["pm2_5"]
+            level = (pm25[0] + pm25[1] * diurnal) * seasonal * (1 + noise)
+            hourly[variable] = np.round(np.clip(level * 1.6, 0, 500)).astype(int).tolist()
+            continue
+        mean, amplitude = _VARIABLE_SHAPES.get(variable, (10.0, 2.0))
+        level = (mean * (0.8 + 0.4 * site) + amplitude * diurnal) * seasonal * (1 + noise)
+        hourly[variable] = np.round(np.clip(level, 0, None), 1).tolist()
+    return hourly
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Request handler; failure injection is configured on the server."""
+
+    server: "StubServer"
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        parsed = urlparse(self.path)
+        if parsed.path != AIR_QUALITY_PATH:
+            self._send(404, {"error": True, "reason": "Not Found"})
+            return
+        injected = self.server.next_failure()
+        if injected is not None:
+            status, retry_after = injected
+            headers = {"Retry-After": retry_after} if retry_after is not None else {}
+            self._send(status, {"error": True, "reason": "injected failure"}, headers)
+            return
+        query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        try:
+            latitude = float(query["latitude"])
+            longitude = float(query["longitude"])
+            variables = query.get("hourly", "").split(",")
+            hourly = synthetic_hourly(
+                latitude, longitude, query["start_date"], query["end_date"], variables
+            )
+        except (KeyError, ValueError) as exc:
+            self._send(400, {"error": True, "reason": f"Invalid request: {exc}"})
+            return
+        payload = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "generationtime_ms": 0.1,
+            "utc_offset_seconds": 0,
+            "timezone": "GMT",
+            "timezone_abbreviation": "GMT",
+            "hourly_units": {key: HOURLY_UNITS.get(key, "") for key in hourly},
+            "hourly": hourly,
+        }
+        self.server.record_request(query)
+        self._send(200, payload)
+
+    def _send(
+        self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded HTTP server with a queue of injected failures."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int] = ("127.0.0.1", 0),
+        failures: Optional[List[Tuple[int, Optional[str]]]] = None,
+        verbose: bool = False,
+    ) -> None:
+        super().__init__(address, StubHandler)
+        self.verbose = verbose
+        self._failures = list(failures or [])
+        self._lock = threading.Lock()
+        self.requests: List[Dict[str, str]] = []
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def next_failure(self) -> Optional[Tuple[int, Optional[str]]]:
+        with self._lock:
+            return self._failures.pop(0) if self._failures else None
+
+    def record_request(self, query: Dict[str, str]) -> None:
+        with self._lock:
+            self.requests.append(query)
+
+
+def start_stub_server(
+    failures: Optional[List[Tuple[int, Optional[str]]]] = None, port: int = 0
+) -> StubServer:
+    """Start a stub server on a background thread and return it.
+
+    ``failures`` is a list of ``(status, retry_after)`` responses returned,
+    in order, before normal responses resume. Call ``shutdown()`` when done.
+    """
+    server = StubServer(("127.0.0.1", port), failures=failures)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server = StubServer(("127.0.0.1", args.port), verbose=True)
+    print(f"Serving Open-Meteo stand-in on {server.base_url}{AIR_QUALITY_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Chart rendering for the pipeline's PNG deliverables.
+
+Each chart is described by a :class:`PlotJob`: the chart kind, its output
+path, a title and the NumPy arrays it draws. Jobs hold no pandas or
+matplotlib objects, so they pickle cheaply and can be rendered in worker
+processes. Rendering uses matplotlib's object-oriented API on an Agg
+canvas (``Figure`` + ``FigureCanvasAgg``) instead of pyplot, so no global
+figure state is shared and jobs are independent of each other.
+
+Every job has a fingerprint over its arrays and chart parameters (title,
+size, DPI, ``RENDER_VERSION`` and the matplotlib version). The
+fingerprints of the last render are kept in ``plots/manifest.json``, and a
+chart whose fingerprint and PNG are both still there is not drawn again, so
+repeated runs only re-render the charts whose data changed.
+
+Line series longer than the figure is wide in pixels are reduced with
+:mod:`downsample` (``DOWNSAMPLE_METHOD``) when the jobs are built, which
+also keeps the arrays shipped to worker processes small.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import hashlib
+import json
+import os
+import time
+
+import matplotlib
+
+# charts are only ever written to files; never start an interactive backend
+matplotlib.use("Agg")
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from downsample import downsample  # noqa: E402
+
+PLOT_DPI = 150
+MANIFEST_NAME = "manifest.json"
+# bump when a renderer changes so existing charts are drawn again
+RENDER_VERSION = 2
+# point reduction for line series wider than the figure ("minmax" keeps every
+# bucket's extremes, "lttb" follows the shape with fewer points, None plots all)
+DOWNSAMPLE_METHOD: Optional[str] = "minmax"
+
+
+class PlotJob(NamedTuple):
+    """One chart to render: ``kind`` selects the renderer in ``RENDERERS``."""
+
+    name: str
+    kind: str
+    path: Path
+    title: str
+    data: Dict[str, np.ndarray]
+
+
+def _daily_aqi(fig: Figure, job: PlotJob) -> None:
+    ax = fig.subplots()
+    ax.plot(job.data["date"], job.data["aqi"], color="#d62728")
+    ax.set_title(job.title)
+    ax.set_xlabel("Date")
+    ax.set_ylabel("AQI")
+    ax.grid(alpha=0.3)
+
+
+def _monthly_pm25(fig: Figure, job: PlotJob) -> None:
+    ax = fig.subplots()
+    labels = job.data["month"]
+    ax.bar(np.arange(len(labels)), job.data["pm25"], width=0.5, color="#1f77b4")
+    ax.set_xticks(np.arange(len(labels)), labels, rotation=45, ha="right")
+    ax.set_xlim(-0.5, len(labels) - 0.5)
+    ax.set_title(job.title)
+    ax.set_ylabel("µg/m³")
+    ax.set_xlabel("Month")
+
+
+def _pm_scatter(fig: Figure, job: PlotJob) -> None:
+    ax = fig.subplots()
+    points = ax.scatter(
+        job.data["pm25"], job.data["pm10"], alpha=0.7, c=job.data["aqi"], cmap="plasma"
+    )
+    fig.colorbar(points, ax=ax, label="AQI")
+    ax.set_xlabel("PM2.5 (µg/m³)")
+    ax.set_ylabel("PM10 (µg/m³)")
+    ax.set_title(job.title)
+
+
+def _pm_trends(fig: Figure, job: PlotJob) -> None:
+    axes = fig.subplots(2, 1, sharex=True)
+    axes[0].plot(job.data["pm25_date"], job.data["pm25"], color="#2ca02c")
+    axes[0].set_title("Daily PM2.5")
+    axes[0].set_ylabel("µg/m³")
+    axes[0].grid(alpha=0.2)
+    axes[1].plot(job.data["pm10_date"], job.data["pm10"], color="#ff7f0e")
+    axes[1].set_title("Daily PM10")
+    axes[1].set_ylabel("µg/m³")
+    axes[1].grid(alpha=0.2)
+    axes[1].set_xlabel("Date")
+    fig.suptitle(job.title, y=0.95, fontsize=14)
+
+
+RENDERERS: Dict[str, Callable[[Figure, PlotJob], None]] = {
+    "daily_aqi": _daily_aqi,
+    "monthly_pm25": _monthly_pm25,
+    "pm_scatter": _pm_scatter,
+    "pm_trends": _pm_trends,
+}
+FIGURE_SIZES = {
+    "daily_aqi": (12, 5),
+    "monthly_pm25": (8, 5),
+    "pm_scatter": (6, 5),
+    "pm_trends": (12, 8),
+}
+
+
+def line_points(kind: str) -> int:
+    """Pixel width of a ``kind`` chart, the most points a line needs."""
+    return int(FIGURE_SIZES[kind][0] * PLOT_DPI)
+
+
+def _line(kind: str, x: np.ndarray, y: np.ndarray) -> tuple:
+    if DOWNSAMPLE_METHOD is None:
+        return x, y
+    return downsample(x, y, line_points(kind), DOWNSAMPLE_METHOD)
+
+
+def render_plot(job: PlotJob) -> float:
+    """Draw and save one chart; returns the render time in seconds."""
+    started = time.perf_counter()
+    fig = Figure(figsize=FIGURE_SIZES[job.kind])
+    FigureCanvasAgg(fig)
+    RENDERERS[job.kind](fig, job)
+    fig.tight_layout()
+    job.path.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(job.path, dpi=PLOT_DPI)
+    return time.perf_counter() - started
+
+
+def job_fingerprint(job: PlotJob) -> str:
+    """Hash of everything that determines the chart ``job`` draws."""
+    digest = hashlib.sha256()
+    params = [job.kind, job.title, FIGURE_SIZES[job.kind], PLOT_DPI, RENDER_VERSION]
+    params.append(matplotlib.__version__)
+    digest.update(json.dumps(params).encode("utf-8"))
+    for key in sorted(job.data):
+        values = np.ascontiguousarray(job.data[key])
+        digest.update(f"{key}:{values.dtype.str}:{values.shape}".encode("utf-8"))
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+def load_manifest(path: Path) -> Dict[str, str]:
+    """Chart name → fingerprint of the last render; empty if unreadable."""
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def write_manifest(path: Path, manifest: Dict[str, str]) -> None:
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def render_plots(
+    jobs: Sequence[PlotJob],
+    workers: Optional[int] = None,
+    manifest_path: Optional[Path] = None,
+) -> Dict[str, Optional[float]]:
+    """Render ``jobs`` on a process pool; returns seconds per chart name.
+
+    With ``manifest_path`` charts whose fingerprint matches the manifest and
+    whose PNG exists are skipped (reported as ``None``), and the manifest is
+    rewritten for the charts of this run. ``workers`` defaults to the CPU
+    count. With one worker (or one job to draw) the charts are drawn in this
+    process, skipping the pool start-up cost.
+    """
+    fingerprints = {job.name: job_fingerprint(job) for job in jobs}
+    previous = load_manifest(manifest_path) if manifest_path is not None else {}
+    pending = [
+        job
+        for job in jobs
+        if previous.get(job.name) != fingerprints[job.name] or not job.path.exists()
+    ]
+    times: Dict[str, Optional[float]] = {job.name: None for job in jobs}
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    if workers <= 1:
+        times.update((job.name, render_plot(job)) for job in pending)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            times.update(zip((job.name for job in pending), pool.map(render_plot, pending)))
+    if manifest_path is not None:
+        write_manifest(manifest_path, fingerprints)
+    return times
+
+
+def chart_jobs(
+    daily: pd.DataFrame,
+    monthly: pd.DataFrame,
+    plots_dir: Path,
+    label: str,
+    prefix: str = "",
+) -> List[PlotJob]:
+    """The four standard charts of one daily/monthly summary pair.
+
+    ``label`` names the place and period in titles; ``prefix`` is prepended
+    to the file names (e.g. a per-station subdirectory). Line series are
+    downsampled to the chart's pixel width.
+    """
+
+    def job(kind: str, filename: str, title: str, **data: np.ndarray) -> PlotJob:
+        name = f"{prefix}{filename}"
+        return PlotJob(name, kind, plots_dir / name, title, data)
+
+    dates = daily.index.to_numpy()
+    aqi = daily["AQI"].to_numpy(dtype=np.float64)
+    pm25 = daily["pm25"].to_numpy(dtype=np.float64)
+    pm10 = daily["pm10"].to_numpy(dtype=np.float64)
+    months = np.array([str(month) for month in monthly.index])
+    aqi_date, aqi_line = _line("daily_aqi", dates, aqi)
+    pm25_date, pm25_line = _line("pm_trends", dates, pm25)
+    pm10_date, pm10_line = _line("pm_trends", dates, pm10)
+    return [
+        job(
+            "daily_aqi",
+            "daily_aqi_trend.png",
+            f"Daily AQI Trend – {label}",
+            date=aqi_date,
+            aqi=aqi_line,
+        ),
+        job(
+            "monthly_pm25",
+            "monthly_average_pm25.png",
+            "Monthly Average PM2.5",
+            month=months,
+            pm25=monthly["pm25"].to_numpy(dtype=np.float64),
+        ),
+        job(
+            "pm_scatter",
+            "pm25_vs_pm10.png",
+            "PM2.5 vs PM10 Concentration",
+            pm25=pm25,
+            pm10=pm10,
+            aqi=aqi,
+        ),
+        job(
+            "pm_trends",
+            "pm_trends_subplots.png",
+            f"Particulate Matter Trends – {label}",
+            pm25_date=pm25_date,
+            pm25=pm25_line,
+            pm10_date=pm10_date,
+            pm10=pm10_line,
+        ),
+    ]
@@ -0,0 +1,134 @@
+"""
+Stage-level timing and memory instrumentation.
+
+Each pipeline stage runs inside ``StageProfiler.stage(...)``, which records
+wall time, CPU time, the tracemalloc allocation delta and peak, the process
+peak RSS, and row counts. The collected records are printed as a table and
+written to JSON so runs can be compared over time.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import datetime as dt
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+try:  # not available on Windows
+    import resource
+except ImportError:  # pragma: no cover - platform dependent
+    resource = None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process so far, if the OS reports it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+@dataclass
+class StageRecord:
+    """Measurements for one stage execution."""
+
+    name: str
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    alloc_delta_bytes: Optional[int] = None
+    alloc_peak_bytes: Optional[int] = None
+    peak_rss_bytes: Optional[int] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+class StageProfiler:
+    """Collects a :class:`StageRecord` per stage of a run."""
+
+    def __init__(self, trace_memory: bool = True) -> None:
+        self.trace_memory = trace_memory
+        self.records: List[StageRecord] = []
+        self.started_at = dt.datetime.now(dt.timezone.utc)
+        self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[StageRecord]:
+        """Measure the enclosed block; set ``rows_out`` on the yielded record."""
+        record = StageRecord(name=name, rows_in=rows_in)
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            alloc_before = tracemalloc.get_traced_memory()[0]
+        wall_before = time.perf_counter()
+        cpu_before = time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_s = time.perf_counter() - wall_before
+            record.cpu_s = time.process_time() - cpu_before
+            if self.trace_memory and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                record.alloc_delta_bytes = current - alloc_before
+                record.alloc_peak_bytes = max(0, peak - alloc_before)
+            record.peak_rss_bytes = peak_rss_bytes()
+            self.records.append(record)
+
+    def stop(self) -> None:
+        """Stop tracemalloc if this profiler started it."""
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracing = False
+
+    def format_table(self) -> str:
+        """Fixed-width summary table of all recorded stages."""
+        header = (
+            f"{'stage':<18}{'wall s':>9}{'cpu s':>9}{'rows in':>11}{'rows out':>11}"
+            f"{'alloc Δ MB':>12}{'alloc pk MB':>13}{'peak RSS MB':>13}"
+        )
+        lines = [header, "-" * len(header)]
+        for rec in self.records:
+            lines.append(
+                f"{rec.name:<18}{rec.wall_s:>9.3f}{rec.cpu_s:>9.3f}"
+                f"{_fmt_int(rec.rows_in):>11}{_fmt_int(rec.rows_out):>11}"
+                f"{_fmt_mb(rec.alloc_delta_bytes):>12}{_fmt_mb(rec.alloc_peak_bytes):>13}"
+                f"{_fmt_mb(rec.peak_rss_bytes):>13}"
+            )
+        total_wall = sum(rec.wall_s for rec in self.records)
+        total_cpu = sum(rec.cpu_s for rec in self.records)
+        lines.append("-" * len(header))
+        lines.append(f"{'total':<18}{total_wall:>9.3f}{total_cpu:>9.3f}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at.isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "trace_memory": self.trace_memory,
+            "total_wall_s": sum(rec.wall_s for rec in self.records),
+            "stages": [asdict(rec) for rec in self.records],
+        }
+
+    def write_json(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def _fmt_int(value: Optional[int]) -> str:
+    return "-" if value is None else f"{value:,}"
+
+
+def _fmt_mb(value: Optional[int]) -> str:
+    return "-" if value is None else f"{value / (1024 * 1024):.1f}"
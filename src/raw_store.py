@@ -0,0 +1,401 @@
+"""
+Raw hourly data store.
+
+Keeps every hourly reading fetched so far, keyed by ``(station, datetime)``,
+so later runs only need to download the hours that are missing.
+
+Readings live in a Parquet dataset partitioned as
+``station=<name>/year=<yyyy>/month=<m>/``. Concentrations are stored as
+float32 and timestamps as ``timestamp[ns, UTC]`` alongside the station's
+IANA timezone; :func:`load_raw` converts them back to local wall-clock
+times, which is what the API returns and what daily aggregation uses.
+Readers can restrict stations, dates and columns so only the matching
+partitions and column chunks are decoded, and :func:`iter_raw` streams the
+store a few months of one station at a time for inputs larger than memory.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import datetime as dt
+import hashlib
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from schema import CONCENTRATION_COLUMNS, CONCENTRATION_DTYPE, TIMESTAMP_DTYPE
+
+KEY_COLUMNS = ["station", "datetime"]
+PARTITION_COLUMNS = ["station", "year", "month"]
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("station", pa.string()), ("year", pa.int16()), ("month", pa.int8())]),
+    flavor="hive",
+)
+
+DateRange = Tuple[str, str]
+
+
+def _to_storage(df: pd.DataFrame, default_timezone: str = "UTC") -> pd.DataFrame:
+    """Convert an in-memory frame (local naive times) to the on-disk layout.
+
+    On a DST fall-back day the API lists the repeated local hour twice, in
+    order; the first occurrence is taken as daylight time and the second as
+    standard time, so both readings keep distinct UTC instants.
+    """
+    out = df.copy()
+    if "timezone" not in out.columns:
+        out["timezone"] = default_timezone
+    out["station"] = out["station"].astype(str)
+    out["timezone"] = out["timezone"].astype(str)
+    out["year"] = out["datetime"].dt.year.astype("int16")
+    out["month"] = out["datetime"].dt.month.astype("int8")
+    # flags only matter for ambiguous wall-clock times: True selects DST
+    first_seen = ~out.duplicated(["station", "datetime"], keep="first")
+    utc = pd.Series(pd.NaT, index=out.index, dtype="datetime64[ns, UTC]")
+    for tz, rows in out.groupby("timezone", sort=False).groups.items():
+        local = out.loc[rows, "datetime"].dt.tz_localize(
+            tz, ambiguous=first_seen.loc[rows].to_numpy(), nonexistent="shift_forward"
+        )
+        utc.loc[rows] = local.dt.tz_convert("UTC")
+    out["datetime"] = utc
+    for col in CONCENTRATION_COLUMNS:
+        if col in out.columns:
+            out[col] = out[col].astype("float32")
+    return out
+
+
+def _from_storage(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert stored rows back to local naive wall-clock timestamps.
+
+    Empty results are converted too, so callers always get naive timestamps.
+    """
+    df = df.drop(columns=[col for col in ("year", "month") if col in df.columns])
+    if "datetime" not in df.columns:
+        return df
+    if "timezone" not in df.columns:
+        df["datetime"] = df["datetime"].dt.tz_localize(None)
+        return df
+    local = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    for tz, rows in df.groupby("timezone", sort=False, observed=True).groups.items():
+        local.loc[rows] = df.loc[rows, "datetime"].dt.tz_convert(str(tz)).dt.tz_localize(None)
+    df["datetime"] = local
+    return df
+
+
+def _filter(
+    stations: Optional[Sequence[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> Optional[ds.Expression]:
+    """Partition-pruning filter for stations and whole months in range."""
+    expr = None
+    if stations is not None:
+        expr = ds.field("station").isin(list(stations))
+    if start_date is not None or end_date is not None:
+        lo = pd.Timestamp(start_date or "1900-01-01")
+        hi = pd.Timestamp(end_date or "2200-12-31")
+        key = ds.field("year").cast(pa.int32()) * 12 + ds.field("month").cast(pa.int32())
+        months = (key >= lo.year * 12 + lo.month) & (key <= hi.year * 12 + hi.month)
+        expr = months if expr is None else expr & months
+    return expr
+
+
+def _open(root: Path) -> ds.Dataset:
+    return ds.dataset(root, format="parquet", partitioning=PARTITIONING)
+
+
+def _read(
+    dataset: ds.Dataset,
+    expr: Optional[ds.Expression],
+    start_date: Optional[str],
+    end_date: Optional[str],
+    columns: Optional[Sequence[str]],
+) -> pd.DataFrame:
+    """Decode the rows matching ``expr`` into the in-memory layout."""
+    wanted = None
+    if columns is not None:
+        wanted = list(dict.fromkeys([*KEY_COLUMNS, "timezone", *columns]))
+        wanted = [col for col in wanted if col in dataset.schema.names]
+    table = dataset.to_table(columns=wanted, filter=expr)
+    df = _from_storage(table.to_pandas())
+    if columns is not None and "timezone" not in columns and "timezone" in df.columns:
+        del df["timezone"]
+    if "station" in df.columns:
+        df["station"] = df["station"].astype(str).astype("category")
+    if start_date is not None or end_date is not None:
+        lo = pd.Timestamp(start_date or "1900-01-01")
+        hi = pd.Timestamp(end_date or "2200-12-31") + pd.Timedelta(days=1)
+        df = df[(df["datetime"] >= lo) & (df["datetime"] < hi)]
+    return df.sort_values(KEY_COLUMNS, kind="stable").reset_index(drop=True)
+
+
+def load_raw(
+    root: Path,
+    stations: Optional[Sequence[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """Read (part of) the raw store with local naive ``datetime`` values.
+
+    ``stations`` and the inclusive date range prune partitions; ``columns``
+    limits which columns are decoded (key columns are always included). The
+    ``station`` column is categorical and the ``timezone`` column, needed only
+    to convert timestamps, is dropped unless requested. An empty frame is
+    returned when the store does not exist yet. Empty results have the same
+    dtypes as populated ones.
+    """
+    if not root.exists():
+        return pd.DataFrame(
+            {
+                "station": pd.Categorical([]),
+                "datetime": pd.Series(dtype=TIMESTAMP_DTYPE),
+                **{
+                    col: pd.Series(dtype=CONCENTRATION_DTYPE if col in CONCENTRATION_COLUMNS else object)
+                    for col in columns or []
+                },
+            }
+        )
+    return _read(
+        _open(root), _filter(stations, start_date, end_date), start_date, end_date, columns
+    )
+
+
+def store_fingerprint(root: Path) -> str:
+    """Hash of the store's file names, sizes and modification times.
+
+    Cheap (no file is read) and changes whenever a partition is rewritten.
+    """
+    digest = hashlib.sha256()
+    if root.exists():
+        for path in sorted(root.rglob("*.parquet")):
+            stat = path.stat()
+            entry = f"{path.relative_to(root).as_posix()}:{stat.st_size}:{stat.st_mtime_ns}\n"
+            digest.update(entry.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def stored_months(root: Path) -> Dict[str, List[Tuple[int, int]]]:
+    """Sorted ``(year, month)`` partitions present per station, from paths only."""
+    months: Dict[str, set] = {}
+    if not root.exists():
+        return {}
+    for fragment in _open(root).get_fragments():
+        keys = ds.get_partition_keys(fragment.partition_expression)
+        months.setdefault(keys["station"], set()).add((keys["year"], keys["month"]))
+    return {station: sorted(months[station]) for station in sorted(months)}
+
+
+def iter_raw(
+    root: Path,
+    stations: Optional[Sequence[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    chunk_months: int = 12,
+) -> Iterator[pd.DataFrame]:
+    """Yield the same rows as :func:`load_raw`, in ``(station, datetime)`` order.
+
+    Each chunk holds up to ``chunk_months`` stored months of a single
+    station, so memory is bounded by the chunk size rather than the store.
+    """
+    if chunk_months < 1:
+        raise ValueError("chunk_months must be at least 1")
+    dataset = None
+    lo = pd.Timestamp(start_date or "1900-01-01")
+    hi = pd.Timestamp(end_date or "2200-12-31")
+    for station, months in stored_months(root).items():
+        if stations is not None and station not in stations:
+            continue
+        months = [
+            (year, month)
+            for year, month in months
+            if lo.year * 12 + lo.month <= year * 12 + month <= hi.year * 12 + hi.month
+        ]
+        dataset = dataset or _open(root)
+        for offset in range(0, len(months), chunk_months):
+            batch = months[offset : offset + chunk_months]
+            key = ds.field("year").cast(pa.int32()) * 12 + ds.field("month").cast(pa.int32())
+            expr = (ds.field("station") == station) & key.isin(
+                [year * 12 + month for year, month in batch]
+            )
+            chunk = _read(dataset, expr, start_date, end_date, columns)
+            if not chunk.empty:
+                yield chunk
+
+
+def update_raw(root: Path, new: pd.DataFrame, default_timezone: str = "UTC") -> int:
+    """Merge ``new`` readings into the store, rewriting only touched partitions.
+
+    Rows in ``new`` replace stored rows with the same ``(station, datetime)``.
+    Returns the number of partitions written.
+    """
+    if new.empty:
+        return 0
+    incoming = _to_storage(new, default_timezone)
+    touched = incoming[PARTITION_COLUMNS].drop_duplicates()
+    existing = pd.DataFrame(columns=KEY_COLUMNS)
+    if root.exists():
+        # two isin tests prune fragments in one pass each; an OR of one term per
+        # touched partition is evaluated against every fragment (quadratic)
+        month_keys = touched["year"].astype("int32") * 12 + touched["month"].astype("int32")
+        key = ds.field("year").cast(pa.int32()) * 12 + ds.field("month").cast(pa.int32())
+        expr = ds.field("station").isin(touched["station"].unique().tolist()) & key.isin(
+            month_keys.unique().tolist()
+        )
+        existing = _open(root).to_table(filter=expr).to_pandas()
+        existing["station"] = existing["station"].astype(str)
+        # the filter selects every touched station in every touched month; keep
+        # only the partitions actually being rewritten
+        existing_keys = existing["year"].astype("int32") * 12 + existing["month"].astype("int32")
+        wanted = pd.MultiIndex.from_arrays([touched["station"], month_keys])
+        existing = existing[
+            pd.MultiIndex.from_arrays([existing["station"], existing_keys]).isin(wanted)
+        ]
+    merged = merge_raw(existing, incoming)
+    root.mkdir(parents=True, exist_ok=True)
+    ds.write_dataset(
+        pa.Table.from_pandas(merged, preserve_index=False),
+        root,
+        format="parquet",
+        partitioning=PARTITIONING,
+        existing_data_behavior="delete_matching",
+        basename_template="part-{i}.parquet",
+    )
+    return len(touched)
+
+
+def merge_raw(existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """Append ``new`` readings, letting them replace any stored duplicates."""
+    if new.empty:
+        return existing
+    if existing.empty:
+        merged = new
+    else:
+        merged = pd.concat([existing, new], ignore_index=True)
+    merged = merged.drop_duplicates(subset=KEY_COLUMNS, keep="last")
+    return merged.sort_values(KEY_COLUMNS, kind="stable").reset_index(drop=True)
+
+
+def split_date_range(start_date: str, end_date: str, freq: Optional[str]) -> List[DateRange]:
+    """Split an inclusive date range at ``freq`` boundaries (e.g. ``"MS"``)."""
+    start = pd.Timestamp(start_date)
+    end = pd.Timestamp(end_date)
+    if freq is None or end < start:
+        return [(start_date, end_date)]
+    boundaries = [b for b in pd.date_range(start, end, freq=freq) if b > start]
+    chunk_starts = [start] + boundaries
+    chunk_ends = [b - pd.Timedelta(days=1) for b in boundaries] + [end]
+    return [
+        (lo.date().isoformat(), hi.date().isoformat())
+        for lo, hi in zip(chunk_starts, chunk_ends)
+    ]
+
+
+def _spool_path(spool_dir: Path, station: str, chunk: DateRange) -> Path:
+    digest = hashlib.sha1(station.encode("utf-8")).hexdigest()[:12]
+    return spool_dir / f"{digest}_{chunk[0]}_{chunk[1]}.pkl"
+
+
+def spool_chunk(spool_dir: Path, station: str, chunk: DateRange, frame: pd.DataFrame) -> None:
+    """Checkpoint one downloaded chunk so an interrupted backfill can resume."""
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    target = _spool_path(spool_dir, station, chunk)
+    tmp = target.with_suffix(".tmp")
+    frame.to_pickle(tmp)
+    os.replace(tmp, target)
+
+
+def load_spool(spool_dir: Path) -> pd.DataFrame:
+    """All chunks checkpointed by a previous, unfinished run."""
+    files = sorted(spool_dir.glob("*.pkl")) if spool_dir.exists() else []
+    if not files:
+        return pd.DataFrame(columns=KEY_COLUMNS)
+    return pd.concat([pd.read_pickle(path) for path in files], ignore_index=True)
+
+
+def clear_spool(spool_dir: Path) -> None:
+    """Remove checkpoints once they have been merged into the store."""
+    shutil.rmtree(spool_dir, ignore_errors=True)
+
+
+def _collapse_dates(dates: Iterable[dt.date]) -> List[DateRange]:
+    """Group sorted dates into inclusive ``(start, end)`` ISO ranges."""
+    ranges: List[DateRange] = []
+    start = prev = None
+    for day in dates:
+        if start is None:
+            start = prev = day
+        elif day - prev == dt.timedelta(days=1):
+            prev = day
+        else:
+            ranges.append((start.isoformat(), prev.isoformat()))
+            start = prev = day
+    if start is not None:
+        ranges.append((start.isoformat(), prev.isoformat()))
+    return ranges
+
+
+def _local_hours(days: pd.DatetimeIndex, timezone: Optional[str]) -> pd.DatetimeIndex:
+    """Naive local wall-clock hours that exist in ``timezone`` over ``days``.
+
+    A DST spring-forward day has 23 of them and a fall-back day lists the
+    repeated hour twice; without a timezone every day has 24.
+    """
+    if timezone is None:
+        return pd.date_range(days[0], days[-1] + pd.Timedelta(hours=23), freq="h")
+    start = days[0].tz_localize(timezone, nonexistent="shift_forward", ambiguous=True)
+    stop = (days[-1] + pd.Timedelta(days=1)).tz_localize(
+        timezone, nonexistent="shift_forward", ambiguous=True
+    )
+    # dropping the zone keeps each instant's local wall-clock time
+    return pd.date_range(start, stop, freq="h", inclusive="left").tz_localize(None)
+
+
+def missing_ranges(
+    existing: pd.DataFrame,
+    stations: Iterable[str],
+    start_date: str,
+    end_date: str,
+    refresh_from: Optional[dt.date] = None,
+) -> Dict[str, List[DateRange]]:
+    """Date ranges per station that still need downloading.
+
+    A day is missing when any hour of it is absent from the store. When
+    ``existing`` carries a ``timezone`` column, a station's hours are those
+    that exist on its local clock, so DST transition days are not reported
+    as permanently incomplete. Days on or after ``refresh_from`` are always
+    re-requested because the provider may still revise them.
+    """
+    days = pd.date_range(start_date, end_date, freq="D")
+    have: Dict[str, pd.DatetimeIndex] = {}
+    zones: Dict[str, str] = {}
+    if not existing.empty:
+        for station, frame in existing.groupby("station", sort=False, observed=True):
+            have[station] = pd.DatetimeIndex(frame["datetime"].unique())
+            if "timezone" in frame.columns:
+                zones[station] = str(frame["timezone"].iloc[0])
+    grids: Dict[Optional[str], pd.DatetimeIndex] = {}
+    result: Dict[str, List[DateRange]] = {}
+    for station in stations:
+        stored = have.get(station)
+        if stored is None:
+            gaps = days.date
+        else:
+            timezone = zones.get(station)
+            if timezone not in grids:
+                grids[timezone] = _local_hours(days, timezone)
+            expected = grids[timezone]
+            absent = expected[~expected.isin(stored)]
+            gaps = sorted(set(absent.date))
+        gap_set = set(gaps)
+        if refresh_from is not None:
+            gap_set.update(day for day in days.date if day >= refresh_from)
+        result[station] = _collapse_dates(sorted(gap_set))
+    return result
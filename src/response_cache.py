@@ -0,0 +1,206 @@
+"""
+On-disk cache for decoded Open-Meteo responses.
+
+Entries are keyed by a SHA-256 of the normalized request (URL including the
+server, coordinates, dates, variables, timezone) and stored as
+gzip-compressed JSON together with a hash of the payload, so a truncated or
+edited file is treated as a miss. Keying on the server keeps payloads from
+a local stand-in (``OPEN_METEO_BASE_URL``) apart from the real API's.
+Requests whose date range lies fully in the past never expire; everything
+else lives for ``ttl_s`` seconds. The directory is kept under ``max_bytes``
+by evicting the least recently used entries. Its size is scanned once and
+then tracked as entries are written; only when the total exceeds the bound
+is the directory scanned again and trimmed to ``EVICT_TO_FRACTION`` of it,
+so filling the cache stays linear in the number of entries.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import datetime as dt
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+COORDINATE_DECIMALS = 4
+# eviction trims the cache to this share of ``max_bytes``, leaving headroom so
+# the next writes do not immediately trigger another scan
+EVICT_TO_FRACTION = 0.9
+
+
+def normalize_url(url: str) -> str:
+    """``url`` with a lower-case scheme and host and no trailing slash."""
+    parts = urlsplit(url)
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), parts.query, "")
+    )
+
+
+def normalize_params(url: str, params: Mapping[str, Any]) -> Dict[str, str]:
+    """Canonical form of a request so equivalent calls share a cache key."""
+    normalized = {"url": normalize_url(url)}
+    for key, value in params.items():
+        if key in ("latitude", "longitude"):
+            normalized[key] = f"{float(value):.{COORDINATE_DECIMALS}f}"
+        elif key == "hourly":
+            variables = value.split(",") if isinstance(value, str) else list(value)
+            normalized[key] = ",".join(sorted(v.strip() for v in variables))
+        else:
+            normalized[key] = str(value)
+    return dict(sorted(normalized.items()))
+
+
+def cache_key(url: str, params: Mapping[str, Any]) -> str:
+    encoded = json.dumps(normalize_params(url, params), separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _payload_digest(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of JSON payloads with TTL and immutable ranges."""
+
+    def __init__(
+        self,
+        directory: Path,
+        ttl_s: float = 6 * 3600,
+        max_bytes: int = 512 * 1024 * 1024,
+        immutable_after_days: int = 2,
+    ) -> None:
+        self.directory = Path(directory)
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self.immutable_after_days = immutable_after_days
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        # bytes on disk as of the last scan plus writes since; None until scanned
+        self._total_bytes: Optional[int] = None
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json.gz"
+
+    def is_immutable(self, params: Mapping[str, Any]) -> bool:
+        """True when the requested range ended long enough ago to be final."""
+        end_date = params.get("end_date")
+        if not end_date:
+            return False
+        try:
+            end = dt.date.fromisoformat(str(end_date))
+        except ValueError:
+            return False
+        cutoff = dt.datetime.now(dt.timezone.utc).date() - dt.timedelta(
+            days=self.immutable_after_days
+        )
+        return end < cutoff
+
+    def get(self, url: str, params: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the cached payload, or ``None`` on a miss or stale entry."""
+        entry = self._entry_path(cache_key(url, params))
+        payload = self._read(entry, params)
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return payload
+
+    def _read(self, entry: Path, params: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            stat = entry.stat()
+            with gzip.open(entry, "rb") as f:
+                record = json.loads(f.read())
+        except (OSError, ValueError, EOFError):
+            return None
+        if not record.get("immutable") and time.time() - record.get("stored_at", 0) > self.ttl_s:
+            return None
+        body = record.get("body", "")
+        if _payload_digest(body.encode("utf-8")) != record.get("sha256"):
+            return None
+        # bump access time for LRU ordering
+        try:
+            os.utime(entry, (time.time(), stat.st_mtime))
+        except OSError:
+            pass
+        return json.loads(body)
+
+    def put(self, url: str, params: Mapping[str, Any], payload: Dict[str, Any]) -> None:
+        """Store ``payload`` atomically and enforce the size bound."""
+        entry = self._entry_path(cache_key(url, params))
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        body = json.dumps(payload, separators=(",", ":"))
+        record = {
+            "params": normalize_params(url, params),
+            "stored_at": time.time(),
+            "immutable": self.is_immutable(params),
+            "sha256": _payload_digest(body.encode("utf-8")),
+            "body": body,
+        }
+        tmp = entry.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp, "wb", compresslevel=6) as f:
+            f.write(json.dumps(record, separators=(",", ":")).encode("utf-8"))
+        try:
+            replaced = entry.stat().st_size
+        except OSError:
+            replaced = 0
+        size = tmp.stat().st_size
+        os.replace(tmp, entry)
+        with self._lock:
+            self.stores += 1
+            if self._total_bytes is not None:
+                self._total_bytes += size - replaced
+            scan = self._total_bytes is None or self._total_bytes > self.max_bytes
+        if scan:
+            self.evict()
+
+    def evict(self) -> None:
+        """Rescan the directory; if over ``max_bytes``, drop least recently used entries.
+
+        Entries are removed until the total is at most ``EVICT_TO_FRACTION``
+        of ``max_bytes``.
+        """
+        with self._evict_lock:
+            entries = []
+            total = 0
+            for entry in self.directory.glob("*/*.json.gz"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_atime, stat.st_size, entry))
+                total += stat.st_size
+            if total > self.max_bytes:
+                target = self.max_bytes * EVICT_TO_FRACTION
+                entries.sort()
+                for _, size, entry in entries:
+                    if total <= target:
+                        break
+                    try:
+                        entry.unlink()
+                    except OSError:
+                        continue
+                    total -= size
+                    with self._lock:
+                        self.evictions += 1
+            with self._lock:
+                self._total_bytes = total
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,58 @@
+"""
+Column schema for hourly readings and the station dimension table.
+
+Hourly readings are held in long format, one row per (station, hour): a
+categorical ``station`` id, a naive local ``datetime64[ns]`` timestamp and
+float32 concentrations. Attributes that are constant per station
+(coordinates, timezone) are kept once in a station table keyed by
+``station`` instead of being repeated on every row, so they never end up
+averaged into daily or monthly summaries. That is about 34 bytes per
+reading instead of ~200 with float64 columns, string station/timezone
+values and repeated coordinates. Daily frames follow the same rules with a
+``datetime64[ns]`` ``date`` column.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import pandas as pd
+
+from stations import Station
+
+CONCENTRATION_COLUMNS = ["pm25", "pm10", "co", "no2", "so2", "aqi_reference"]
+CONCENTRATION_DTYPE = "float32"
+TIMESTAMP_DTYPE = "datetime64[ns]"
+# timezone is only carried on hourly frames between the API and the raw store,
+# which needs it to convert local times to UTC
+HOURLY_COLUMNS = ["station", "datetime", "timezone", *CONCENTRATION_COLUMNS]
+STATION_COLUMNS = ["station", "latitude", "longitude", "timezone"]
+
+
+def apply_hourly_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast ``df`` to the hourly schema, dropping columns outside it.
+
+    Columns are converted on ``df`` itself where possible, so pass a frame
+    the caller owns. Per-row station attributes such as ``latitude`` and
+    ``longitude`` are removed; they belong in :func:`station_table`.
+    """
+    extra = [col for col in df.columns if col not in HOURLY_COLUMNS]
+    if extra:
+        df = df.drop(columns=extra)
+    for col in ("station", "timezone"):
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    if "datetime" in df.columns and df["datetime"].dtype != TIMESTAMP_DTYPE:
+        df["datetime"] = pd.to_datetime(df["datetime"]).astype(TIMESTAMP_DTYPE)
+    for col in CONCENTRATION_COLUMNS:
+        if col in df.columns and df[col].dtype != CONCENTRATION_DTYPE:
+            df[col] = df[col].astype(CONCENTRATION_DTYPE)
+    return df
+
+
+def station_table(stations: Sequence[Station]) -> pd.DataFrame:
+    """Station dimension table (one row per station) for joining onto results."""
+    return pd.DataFrame(
+        [(s.name, s.latitude, s.longitude, s.timezone) for s in stations],
+        columns=STATION_COLUMNS,
+    )
@@ -0,0 +1,99 @@
+"""
+Season calendars for the seasonal summary.
+
+A calendar assigns every month to exactly one season and fixes the order the
+seasons are reported in. It is compiled into a 13-entry code array indexed
+by month number (entry 0 is unused), so labelling a whole column is a
+single gather followed by ``pd.Categorical.from_codes`` rather than a Python
+call per row. Built in:
+
+* ``india`` – the Indian seasons the pipeline has always reported (default).
+* ``temperate_north`` / ``temperate_south`` – meteorological seasons
+  (DJF, MAM, JJA, SON) for the northern and southern hemispheres.
+
+Other regions can be added with :func:`register_calendar`.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, NamedTuple, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class SeasonCalendar(NamedTuple):
+    """Month → season mapping compiled for vectorized labelling."""
+
+    name: str
+    seasons: Tuple[str, ...]
+    # season code per month number; index 0 is -1 (no month 0)
+    codes: np.ndarray
+
+
+def make_calendar(name: str, definition: Dict[str, Sequence[int]]) -> SeasonCalendar:
+    """Compile ``{season: months}`` (in report order) into a calendar.
+
+    Raises ``ValueError`` unless every month 1–12 belongs to exactly one
+    season.
+    """
+    codes = np.full(13, -1, dtype=np.int8)
+    for code, (season, months) in enumerate(definition.items()):
+        for month in months:
+            if not 1 <= month <= 12:
+                raise ValueError(f"{name}: month {month} of {season!r} is not 1–12")
+            if codes[month] != -1:
+                raise ValueError(f"{name}: month {month} is assigned to two seasons")
+            codes[month] = code
+    missing = [month for month in range(1, 13) if codes[month] == -1]
+    if missing:
+        raise ValueError(f"{name}: months {missing} have no season")
+    return SeasonCalendar(name, tuple(definition), codes)
+
+
+SEASON_CALENDARS: Dict[str, SeasonCalendar] = {}
+
+
+def register_calendar(calendar: SeasonCalendar) -> None:
+    """Add (or replace) a calendar in the registry."""
+    SEASON_CALENDARS[calendar.name] = calendar
+
+
+def get_calendar(name: str) -> SeasonCalendar:
+    try:
+        return SEASON_CALENDARS[name]
+    except KeyError:
+        known = ", ".join(sorted(SEASON_CALENDARS))
+        raise ValueError(f"Unknown season calendar {name!r} (known: {known})") from None
+
+
+register_calendar(
+    make_calendar(
+        "india",
+        {
+            "Winter": (12, 1, 2),
+            "Summer": (3, 4),
+            "Monsoon": (5, 6, 7),
+            "Post Monsoon": (8, 9, 10),
+            "Late Autumn": (11,),
+        },
+    )
+)
+register_calendar(
+    make_calendar(
+        "temperate_north",
+        {"Winter": (12, 1, 2), "Spring": (3, 4, 5), "Summer": (6, 7, 8), "Autumn": (9, 10, 11)},
+    )
+)
+register_calendar(
+    make_calendar(
+        "temperate_south",
+        {"Summer": (12, 1, 2), "Autumn": (3, 4, 5), "Winter": (6, 7, 8), "Spring": (9, 10, 11)},
+    )
+)
+
+
+def season_labels(months: np.ndarray, calendar: SeasonCalendar) -> pd.Categorical:
+    """Ordered categorical of the season of each month number in ``months``."""
+    codes = calendar.codes[np.asarray(months, dtype=np.intp)]
+    return pd.Categorical.from_codes(codes, categories=list(calendar.seasons), ordered=True)
@@ -0,0 +1,240 @@
+"""
+Cached stage graph for the pipeline.
+
+The pipeline is declared as named :class:`Stage` objects, each listing the
+stages whose outputs it consumes. Every stage gets a key: a SHA-256 over
+its name, its parameters, the source code it depends on (functions and
+modules in ``Stage.code``) and the keys of its inputs, so a key changes
+exactly when something upstream of the stage changed. Root stages fold in
+a ``fingerprint`` of their external input (e.g. the raw store's files).
+
+Outputs of cacheable stages are pickled under ``<cache dir>/<stage>/<key>.pkl``
+(only the latest key per stage is kept). A run first plans: a stage
+executes when it is forced, a dependant of a forced stage, has no cached
+output for its key, or has declared ``outputs`` files that are missing;
+inputs of executing stages are loaded from the cache or, for stages that
+are not cached, executed too. Stages nothing needs are skipped. Stages with
+``always`` set (the network fetch) run on every non-dry run before
+planning, since their effect cannot be known in advance.
+"""
+
+from __future__ import annotations
+
+from importlib.util import find_spec
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+
+from profiling import StageProfiler
+
+# bump to invalidate every cached stage output (e.g. after a pickle-format change)
+CACHE_FORMAT = 1
+
+
+class Stage(NamedTuple):
+    """One node of the pipeline graph.
+
+    ``func`` receives the profiler record followed by the outputs of
+    ``inputs`` in order, and returns the stage output. ``params`` returns the
+    JSON-serialisable settings the output depends on; ``fingerprint``
+    summarises external inputs; ``outputs`` lists files the stage writes.
+    ``code`` may name a module as a string so it is hashed without being
+    imported.
+    """
+
+    name: str
+    func: Callable[..., Any]
+    inputs: Tuple[str, ...] = ()
+    code: Tuple[Union[Callable[..., Any], ModuleType, type, str], ...] = ()
+    params: Optional[Callable[[], Any]] = None
+    fingerprint: Optional[Callable[[], str]] = None
+    outputs: Optional[Callable[[], List[Path]]] = None
+    cache: bool = True
+    always: bool = False
+
+
+class PlannedStage(NamedTuple):
+    """Planner decision for one stage."""
+
+    name: str
+    key: str
+    action: str  # "run", "cached" or "skip"
+    reason: str
+
+
+def code_hash(objects: Iterable[Any]) -> str:
+    """Hash of the source code of functions, classes and modules.
+
+    Strings are module names; their source file is read without importing.
+    """
+    digest = hashlib.sha256()
+    for obj in objects:
+        try:
+            if isinstance(obj, str):
+                spec = find_spec(obj)
+                if spec is None or spec.origin is None:
+                    raise ValueError(f"cannot locate module {obj!r}")
+                source = Path(spec.origin).read_text(encoding="utf-8")
+            else:
+                source = inspect.getsource(obj)
+        except (OSError, TypeError):
+            source = repr(obj)
+        digest.update(source.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class StageCache:
+    """Pickled stage outputs, one file per stage holding its latest key."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def path(self, stage: str, key: str) -> Path:
+        return self.root / stage / f"{key}.pkl"
+
+    def has(self, stage: str, key: str) -> bool:
+        return self.path(stage, key).exists()
+
+    def load(self, stage: str, key: str) -> Any:
+        with open(self.path(stage, key), "rb") as f:
+            return pickle.load(f)
+
+    def store(self, stage: str, key: str, value: Any) -> None:
+        target = self.path(stage, key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, target)
+        for stale in target.parent.glob("*.pkl"):
+            if stale != target:
+                stale.unlink(missing_ok=True)
+
+
+class StageGraph:
+    """Plans and runs :class:`Stage` objects against a :class:`StageCache`."""
+
+    def __init__(self, stages: Sequence[Stage], cache: StageCache) -> None:
+        self.stages = {stage.name: stage for stage in stages}
+        for stage in stages:
+            unknown = [name for name in stage.inputs if name not in self.stages]
+            if unknown:
+                raise ValueError(f"stage {stage.name!r} depends on unknown {unknown}")
+        # declaration order must already be topological
+        seen: set = set()
+        for stage in stages:
+            if any(name not in seen for name in stage.inputs):
+                raise ValueError(f"stage {stage.name!r} is declared before its inputs")
+            seen.add(stage.name)
+        self.cache = cache
+
+    def downstream(self, names: Iterable[str]) -> set:
+        """``names`` plus every stage that depends on them, directly or not."""
+        selected = set(names)
+        for stage in self.stages.values():
+            if any(name in selected for name in stage.inputs):
+                selected.add(stage.name)
+        return selected
+
+    def keys(self) -> Dict[str, str]:
+        keys: Dict[str, str] = {}
+        for stage in self.stages.values():
+            payload = {
+                "format": CACHE_FORMAT,
+                "stage": stage.name,
+                "code": code_hash(stage.code),
+                "params": stage.params() if stage.params else None,
+                "fingerprint": stage.fingerprint() if stage.fingerprint else None,
+                "inputs": [keys[name] for name in stage.inputs],
+            }
+            encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+            keys[stage.name] = hashlib.sha256(encoded).hexdigest()
+        return keys
+
+    def plan(self, force: Iterable[str] = ()) -> List[PlannedStage]:
+        """Decide, per stage, whether it runs, is read from cache or is skipped."""
+        keys = self.keys()
+        forced = self.downstream(force)
+        reasons: Dict[str, str] = {}
+        for stage in self.stages.values():
+            if stage.always:
+                reasons[stage.name] = "always runs"
+            elif stage.name in forced:
+                reasons[stage.name] = "forced"
+            elif stage.cache and not self.cache.has(stage.name, keys[stage.name]):
+                reasons[stage.name] = "inputs, parameters or code changed"
+            elif stage.outputs and not all(path.exists() for path in stage.outputs()):
+                reasons[stage.name] = "output files missing"
+        # outputs of uncached stages are only available by running them
+        needed: Dict[str, str] = {}
+        for stage in reversed(list(self.stages.values())):
+            if stage.name not in reasons and stage.name not in needed:
+                continue
+            for name in stage.inputs:
+                if not self.stages[name].cache and name not in reasons:
+                    needed.setdefault(name, f"needed by {stage.name}")
+        plan = []
+        for stage in self.stages.values():
+            if stage.name in reasons:
+                plan.append(PlannedStage(stage.name, keys[stage.name], "run", reasons[stage.name]))
+            elif stage.name in needed:
+                plan.append(PlannedStage(stage.name, keys[stage.name], "run", needed[stage.name]))
+            elif stage.cache:
+                plan.append(PlannedStage(stage.name, keys[stage.name], "cached", "unchanged"))
+            else:
+                plan.append(PlannedStage(stage.name, keys[stage.name], "skip", "not needed"))
+        return plan
+
+    def run(self, profiler: StageProfiler, force: Iterable[str] = ()) -> List[PlannedStage]:
+        """Run the ``always`` stages, then everything :meth:`plan` selects.
+
+        Cached outputs are only loaded when a running stage consumes them,
+        and every output is released once its last consumer has run.
+        """
+        for stage in self.stages.values():
+            if stage.always:
+                with profiler.stage(stage.name) as rec:
+                    stage.func(rec)
+                    rec.extra["cache"] = "always"
+        plan = [step for step in self.plan(force) if not self.stages[step.name].always]
+        running = {step.name for step in plan if step.action == "run"}
+        consumers: Dict[str, int] = {name: 0 for name in self.stages}
+        for name in running:
+            for input_name in self.stages[name].inputs:
+                consumers[input_name] += 1
+        values: Dict[str, Any] = {}
+        for step in plan:
+            stage = self.stages[step.name]
+            if step.action == "cached" and consumers[step.name]:
+                with profiler.stage(step.name) as rec:
+                    values[step.name] = self.cache.load(step.name, step.key)
+                    rec.extra["cache"] = "hit"
+            if step.action != "run":
+                continue
+            with profiler.stage(step.name) as rec:
+                value = stage.func(rec, *(values[name] for name in stage.inputs))
+                rec.extra["cache"] = step.reason
+            if stage.cache:
+                self.cache.store(step.name, step.key, value)
+            if consumers[step.name]:
+                values[step.name] = value
+            del value
+            for name in stage.inputs:
+                consumers[name] -= 1
+                if consumers[name] == 0:
+                    values.pop(name, None)
+        return plan
+
+
+def format_plan(plan: Sequence[PlannedStage]) -> str:
+    """One line per stage: action, short key and reason."""
+    lines = [f"{'stage':<20}{'action':<9}{'key':<14}reason"]
+    for step in plan:
+        lines.append(f"{step.name:<20}{step.action:<9}{step.key[:12]:<14}{step.reason}")
+    return "\n".join(lines)
@@ -0,0 +1,49 @@
+"""
+Station registry for multi-site runs.
+
+Stations are read from ``data/stations.csv`` (columns ``name``, ``latitude``,
+``longitude``, ``timezone``); when the file is missing the pipeline falls
+back to the single Delhi site it was originally written for.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, NamedTuple
+
+import csv
+
+
+class Station(NamedTuple):
+    """A monitoring site queried from Open-Meteo."""
+
+    name: str
+    latitude: float
+    longitude: float
+    timezone: str = "auto"
+
+
+DEFAULT_STATIONS: List[Station] = [Station("Delhi", 28.6139, 77.209, "auto")]
+
+
+def load_stations(path: Path) -> List[Station]:
+    """Read the station registry CSV, rejecting duplicate station names."""
+    stations: List[Station] = []
+    seen = set()
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            name = row["name"].strip()
+            if name in seen:
+                raise ValueError(f"Duplicate station name in {path}: {name!r}")
+            seen.add(name)
+            stations.append(
+                Station(
+                    name=name,
+                    latitude=float(row["latitude"]),
+                    longitude=float(row["longitude"]),
+                    timezone=(row.get("timezone") or "auto").strip(),
+                )
+            )
+    if not stations:
+        raise ValueError(f"No stations defined in {path}")
+    return stations